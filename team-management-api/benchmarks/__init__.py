@@ -0,0 +1,36 @@
+"""
+Benchmarks for the Team Management API.
+
+Each benchmark is a standalone script, run from the project root with
+`python -m benchmarks.<name>`. They run against a throwaway test database, never
+against the database configured for the project.
+"""
+
+import os
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb=False):
+    """
+    Sets up the test environment (eg. the testserver host and locmem emails), and
+    creates the test database (running all migrations), destroying it on exit.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
@@ -0,0 +1,154 @@
+"""
+Concurrency of the read heavy endpoints at a fixed worker count: the sync views,
+served by a pool of sync workers (threads, each pinned for the whole request),
+against the async views (ASYNC_READ_VIEWS) served by a single event loop.
+Queries are slowed down by --db-latency-ms, standing in for a networked database.
+
+Usage:
+    python -m benchmarks.async_views --requests 400 --workers 4 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import importlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import AsyncClient, Client, override_settings  # noqa: E402
+from django.urls import clear_url_caches  # noqa: E402
+from teams.models import Team, TeamMember, TeamRole  # noqa: E402
+from teams.search import rebuild_search_index  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+from users.serializers import CustomTokenObtainPairSerializer  # noqa: E402
+
+ADMIN_PERMISSIONS = ["team:view", "members:view", "members:add"]
+
+
+def use_async_views(enabled):
+    """Re-imports the URLconf, which picks the views on import."""
+    settings.ASYNC_READ_VIEWS = enabled
+    import core.urls
+    import teams.urls
+
+    importlib.reload(teams.urls)
+    importlib.reload(core.urls)
+    clear_url_caches()
+
+
+def slow_down_queries(latency):
+    def sleep_then_execute(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):
+        # Outermost, as this can run within the wrappers of RequestMetricsMiddleware
+        if sleep_then_execute not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, sleep_then_execute)
+
+    connection_created.connect(install, weak=False)
+    install(connection)
+
+
+def populate(members):
+    role = TeamRole.objects.create(
+        name="Admin", description="Admin", permissions=ADMIN_PERMISSIONS
+    )
+    team = Team.objects.create(name="Team", description="")
+    users = CustomUser.objects.bulk_create(
+        [CustomUser(email=f"user{i}@example.com") for i in range(members)]
+    )
+    TeamMember.objects.bulk_create(
+        [TeamMember(team=team, user=user, role=role) for user in users]
+    )
+    # bulk_create skips the signals maintaining these
+    Team.objects.reconcile_counters(1000)
+    rebuild_search_index(1000)
+    token = CustomTokenObtainPairSerializer.get_token(users[0]).access_token
+    return [
+        f"/api/teams/{team.pk}/members/?page_size=20",
+        f"/api/teams/{team.pk}/permissions/",
+        "/api/active-invitations/",
+    ], str(token)
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    print(
+        f"{name:<28}{len(latencies) / elapsed:>10.0f}"
+        f"{statistics.median(latencies) * 1000:>10.1f}"
+        f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}"
+    )
+
+
+def run_sync(paths, token, requests, workers):
+    def request(index):
+        client = Client()
+        client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]] = token
+        started = time.perf_counter()
+        response = client.get(paths[index % len(paths)])
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(request, range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+async def run_async(paths, token, requests, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def request(index):
+        # As in ASGIHandler, each request gets its own thread for sync code (eg.
+        # the async ORM), which AsyncClient alone doesn't do
+        async with slots, ThreadSensitiveContext():
+            client = AsyncClient()
+            client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]] = token
+            started = time.perf_counter()
+            response = await client.get(paths[index % len(paths)])
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(request(index) for index in range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    with test_database(), override_settings(SLOW_REQUEST_THRESHOLD_MS=60_000):
+        paths, token = populate(args.members)
+        slow_down_queries(args.db_latency_ms / 1000)
+
+        print(f"{'mode':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        use_async_views(False)
+        report(
+            f"sync, {args.workers} workers",
+            *run_sync(paths, token, args.requests, args.workers),
+        )
+        use_async_views(True)
+        report(
+            f"async, {args.concurrency} in flight",
+            *asyncio.run(run_async(paths, token, args.requests, args.concurrency)),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Concurrent writers against a file based SQLite database, comparing the default
+journaling with the WAL/busy_timeout/IMMEDIATE configuration from core/settings.py.
+Each transaction mirrors accepting an invitation: update the invitation, and create
+the team member.
+
+Usage:
+    python -m benchmarks.concurrent_writes --threads 8 --transactions 200
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, connections, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from teams.models import Team, TeamInvitation, TeamMember, TeamRole  # noqa: E402
+
+User = get_user_model()
+
+MODES = {
+    "default": {},
+    "tuned": settings.DATABASES["default"].get("OPTIONS", {}),
+}
+
+
+def populate(threads, transactions):
+    role = TeamRole.objects.create(name="Regular", description="", permissions=[])
+    team = Team.objects.create(name="Team", description="")
+    count = threads * transactions
+    User.objects.bulk_create(
+        [User(email=f"user{i}@example.com", password="!") for i in range(count)]
+    )
+    TeamInvitation.objects.bulk_create(
+        [
+            TeamInvitation(
+                team=team,
+                email=f"user{i}@example.com",
+                first_name="Invited",
+                last_name="User",
+                phone_number="+14155552671",
+                role=role,
+                expires_at=timezone.now() + timedelta(days=1),
+            )
+            for i in range(count)
+        ]
+    )
+    return list(
+        zip(
+            TeamInvitation.objects.order_by("id").values_list("id", flat=True),
+            User.objects.order_by("id").values_list("id", flat=True),
+        )
+    )
+
+
+def writer(work, team_id, role_id, latencies, errors):
+    try:
+        for invitation_id, user_id in work:
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    TeamInvitation.objects.filter(pk=invitation_id).update(
+                        status="accepted"
+                    )
+                    TeamMember.objects.create(
+                        team_id=team_id, user_id=user_id, role_id=role_id
+                    )
+            except Exception as e:
+                errors.append(str(e))
+            else:
+                latencies.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+
+
+def run(mode, options, threads, transactions):
+    settings.DATABASES["default"]["OPTIONS"] = options
+    settings.DATABASES["default"]["TEST"]["NAME"] = os.path.join(
+        tempfile.mkdtemp(), f"{mode}.sqlite3"
+    )
+    connection.close()
+    with test_database():
+        pairs = populate(threads, transactions)
+        team_id = Team.objects.get().pk
+        role_id = TeamRole.objects.get().pk
+        connection.close()
+
+        latencies, errors = [], []
+        workers = [
+            threading.Thread(
+                target=writer,
+                args=(pairs[i::threads], team_id, role_id, latencies, errors),
+            )
+            for i in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    print(f"\n== {mode} {options or ''}")
+    print(f"committed:    {len(latencies)}/{len(pairs)}")
+    print(f"errors:       {len(errors)} {sorted(set(errors))[:3]}")
+    print(f"writes/sec:   {len(latencies) / elapsed:.0f}")
+    if quantiles:
+        print(f"p50/p95 (ms): {quantiles[49] * 1000:.2f} / {quantiles[94] * 1000:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--transactions", type=int, default=200)
+    args = parser.parse_args()
+
+    if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+        raise SystemExit("This benchmark compares SQLite configurations only.")
+    for mode, options in MODES.items():
+        run(mode, options, args.threads, args.transactions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Synthetic data for the benchmarks: users, teams, members and invitations, inserted
+with bulk_create so large datasets load quickly.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from teams.models import Team, TeamInvitation, TeamMember, TeamRole
+from teams.search import rebuild_search_index
+
+User = get_user_model()
+
+PASSWORD = "benchmark-password"
+BATCH_SIZE = 5_000
+ADMIN_PERMISSIONS = [
+    "team:view",
+    "team:update",
+    "team:delete",
+    "members:view",
+    "members:add",
+    "members:update",
+    "members:remove",
+    "members:leave",
+]
+REGULAR_PERMISSIONS = ["team:view", "members:view", "members:leave"]
+
+
+@dataclass
+class Dataset:
+    admin: User
+    admin_role: TeamRole
+    regular_role: TeamRole
+    team_ids: list[int] = field(default_factory=list)
+    # (invitation id, invited user) pairs, ready to be accepted
+    pending_invitations: list[tuple[int, User]] = field(default_factory=list)
+
+
+def generate(teams=20, members_per_team=50, invitations_per_team=10):
+    """
+    Creates `teams` teams administered by a single admin user, each with
+    `members_per_team` members and `invitations_per_team` pending invitations for
+    existing users. All users share the PASSWORD.
+    """
+    password = make_password(PASSWORD)
+    admin_role = TeamRole.objects.create(
+        name="Admin", description="Admin", permissions=ADMIN_PERMISSIONS
+    )
+    regular_role = TeamRole.objects.create(
+        name="Regular", description="Regular", permissions=REGULAR_PERMISSIONS
+    )
+    admin = User.objects.create(
+        email="admin@example.com",
+        first_name="Admin",
+        last_name="User",
+        password=password,
+    )
+
+    team_objects = Team.objects.bulk_create(
+        [Team(name=f"Team {i}", description=f"Team {i}") for i in range(teams)]
+    )
+    user_count = teams * (members_per_team + invitations_per_team)
+    users = User.objects.bulk_create(
+        [
+            User(
+                email=f"user{i}@example.com",
+                first_name="User",
+                last_name=str(i),
+                phone_number="+14155552671",
+                password=password,
+            )
+            for i in range(user_count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    members = [
+        TeamMember(team=team, user=admin, role=admin_role) for team in team_objects
+    ]
+    invitations = []
+    expires_at = timezone.now() + timedelta(days=15)
+    user_iter = iter(users)
+    for team in team_objects:
+        for _ in range(members_per_team):
+            members.append(
+                TeamMember(team=team, user=next(user_iter), role=regular_role)
+            )
+        for _ in range(invitations_per_team):
+            user = next(user_iter)
+            invitations.append(
+                TeamInvitation(
+                    team=team,
+                    email=user.email,
+                    first_name=user.first_name,
+                    last_name=user.last_name,
+                    phone_number=user.phone_number,
+                    role=regular_role,
+                    expires_at=expires_at,
+                )
+            )
+    TeamMember.objects.bulk_create(members, batch_size=BATCH_SIZE)
+    # bulk_create skips the signals maintaining these
+    Team.objects.reconcile_counters(BATCH_SIZE)
+    rebuild_search_index(BATCH_SIZE)
+    invitations = TeamInvitation.objects.bulk_create(invitations, batch_size=BATCH_SIZE)
+    users_by_email = {user.email: user for user in users}
+
+    return Dataset(
+        admin=admin,
+        admin_role=admin_role,
+        regular_role=regular_role,
+        team_ids=[team.pk for team in team_objects],
+        pending_invitations=[
+            (invitation.pk, users_by_email[invitation.email])
+            for invitation in invitations
+        ],
+    )
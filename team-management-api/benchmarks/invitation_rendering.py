@@ -0,0 +1,79 @@
+"""
+Micro-benchmark of the invitation email rendering. Compares rendering each
+invitation with `render_to_string` (the template is looked up on every call),
+with the precompiled templates one invitation at a time (single invites), and
+in one pass (bulk invites). Reports the cost per invitation.
+
+Usage:
+    python -m benchmarks.invitation_rendering --invitations 2000
+"""
+
+import argparse
+import time
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.template.loader import render_to_string  # noqa: E402
+from teams.emails import (  # noqa: E402
+    INVITATION_EXPIRY_DAYS,
+    render_invitation_email,
+    render_invitation_emails,
+)
+from teams.models import Team, TeamInvitation  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+
+def render_uncompiled(invitations, inviter):
+    bodies = []
+    for invitation in invitations:
+        context = {
+            "inviter_name": inviter.get_full_name(),
+            "team_name": invitation.team.name,
+            "accept_url": invitation.get_accept_url(),
+            "reject_url": invitation.get_reject_url(),
+            "expiry_days": INVITATION_EXPIRY_DAYS,
+        }
+        bodies.append(
+            (
+                render_to_string("teams/invitation_email.html", context),
+                render_to_string("teams/invitation_email.txt", context),
+            )
+        )
+    return bodies
+
+
+def render_one_by_one(invitations, inviter):
+    return [render_invitation_email(invitation, inviter) for invitation in invitations]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--invitations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Unsaved instances, rendering doesn't touch the database
+    inviter = CustomUser(first_name="Ada", last_name="Lovelace")
+    team = Team(id=1, name="Analytical Engines")
+    invitations = [
+        TeamInvitation(id=index, team=team, email=f"invitee{index}@example.com")
+        for index in range(1, args.invitations + 1)
+    ]
+
+    expected = render_uncompiled(invitations[:1], inviter)
+    print(f"{'strategy':<24}{'us/invite':>12}")
+    for name, render in [
+        ("render_to_string", render_uncompiled),
+        ("precompiled", render_one_by_one),
+        ("precompiled, batched", render_invitation_emails),
+    ]:
+        assert render(invitations[:1], inviter) == expected, name
+        started = time.perf_counter()
+        render(invitations, inviter)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<24}{elapsed * 1_000_000 / args.invitations:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Latency of the member search (?search=) on a large team, through the FTS5 index
+on SQLite, for selective and unselective terms.
+
+Usage:
+    python -m benchmarks.member_search --members 100000
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from teams.models import Team, TeamMember, TeamRole  # noqa: E402
+from teams.search import rebuild_search_index, search_members  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+QUERIES = ["user4242", "example", "last 999", "f", "+1415000"]
+
+
+def populate(members):
+    role = TeamRole.objects.create(name="Regular", description="", permissions=[])
+    team = Team.objects.create(name="Team", description="")
+    for start in range(0, members, 10_000):
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    email=f"user{i}@example.com",
+                    first_name=f"First{i}",
+                    last_name=f"Last {i}",
+                    phone_number=f"+1415{i:07d}",
+                )
+                for i in range(start, min(start + 10_000, members))
+            ]
+        )
+        TeamMember.objects.bulk_create(
+            [TeamMember(team=team, user=user, role=role) for user in users]
+        )
+    # bulk_create skips the signals maintaining these
+    Team.objects.reconcile_counters(10_000)
+    rebuild_search_index(10_000)
+    return team
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with test_database():
+        team = populate(args.members)
+        print(f"{'query':<16}{'p50 ms':>10}{'max ms':>10}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                # A page of the member list
+                list(
+                    search_members(TeamMember.objects.filter(team=team), query)
+                    .order_by("created_at", "id")
+                    .values_list("id", flat=True)[:50]
+                )
+                timings.append(time.perf_counter() - started)
+            print(
+                f"{query:<16}{statistics.median(timings) * 1000:>10.2f}"
+                f"{max(timings) * 1000:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
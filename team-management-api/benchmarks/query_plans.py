@@ -0,0 +1,155 @@
+"""
+Shows the query plans and timings of the hot TeamMember and TeamInvitation lookups,
+before and after the composite indexes added in teams/migrations/0005.
+
+Usage:
+    python -m benchmarks.query_plans --rows 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.migrations.executor import MigrationExecutor  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+BEFORE_MIGRATION = "0004_add_pagination_ordering_indexes"
+AFTER_MIGRATION = "0005_add_member_and_invitation_lookup_indexes"
+BATCH_SIZE = 10_000
+
+
+def historical_apps(migration):
+    """
+    The models as of the given teams migration, other apps being fully migrated.
+    The current models have columns added by later migrations.
+    """
+    loader = MigrationExecutor(connection).loader
+    nodes = [node for node in loader.graph.leaf_nodes() if node[0] != "teams"]
+    return loader.project_state(nodes + [("teams", migration)]).apps
+
+
+def populate(apps, rows):
+    """Creates `rows` team members and `rows` invitations, spread over sqrt(rows) teams."""
+    Team = apps.get_model("teams", "Team")
+    TeamInvitation = apps.get_model("teams", "TeamInvitation")
+    TeamMember = apps.get_model("teams", "TeamMember")
+    TeamRole = apps.get_model("teams", "TeamRole")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    team_count = max(int(rows**0.5), 1)
+    user_count = max(rows // team_count, 1)
+    now = timezone.now()
+    role = TeamRole.objects.create(name="Regular", description="", permissions=[])
+    Team.objects.bulk_create(
+        [Team(name=f"Team {i}", description="") for i in range(team_count)],
+        batch_size=BATCH_SIZE,
+    )
+    User.objects.bulk_create(
+        [User(email=f"user{i}@example.com", password="!") for i in range(user_count)],
+        batch_size=BATCH_SIZE,
+    )
+    team_ids = list(Team.objects.values_list("id", flat=True))
+    user_ids = list(User.objects.values_list("id", flat=True))
+
+    members = (
+        TeamMember(team_id=team_id, user_id=user_id, role=role)
+        for team_id in team_ids
+        for user_id in user_ids
+    )
+    _bulk_create(TeamMember, members)
+
+    statuses = ["pending", "accepted", "rejected"]
+    invitations = (
+        TeamInvitation(
+            team_id=random.choice(team_ids),
+            email=f"invitee{random.randrange(rows // 5 or 1)}@example.com",
+            first_name="Invited",
+            last_name="User",
+            phone_number="+14155552671",
+            role=role,
+            status=random.choice(statuses),
+            expires_at=now + timedelta(days=random.randint(-15, 15)),
+        )
+        for _ in range(rows)
+    )
+    _bulk_create(TeamInvitation, invitations)
+    return team_ids, user_ids
+
+
+def _bulk_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def lookups(apps, team_ids, user_ids):
+    TeamInvitation = apps.get_model("teams", "TeamInvitation")
+    TeamMember = apps.get_model("teams", "TeamMember")
+    team_id = random.choice(team_ids)
+    user_id = random.choice(user_ids)
+    email = f"invitee{random.randrange(10)}@example.com"
+    now = timezone.now()
+    return {
+        "member (team, user)": TeamMember.objects.filter(
+            team_id=team_id, user_id=user_id
+        ),
+        "member (team, user__email)": TeamMember.objects.filter(
+            team_id=team_id, user__email=f"user{user_id}@example.com"
+        ),
+        "invitation (team, email, status)": TeamInvitation.objects.filter(
+            team_id=team_id, email=email, status__in=["pending", "accepted"]
+        ),
+        "invitation (team, status, expires_at)": TeamInvitation.objects.filter(
+            team_id=team_id, status="pending", expires_at__gt=now
+        ),
+        "invitation (email, status, expires_at)": TeamInvitation.objects.filter(
+            email=email, status="pending", expires_at__gt=now
+        ),
+    }
+
+
+def report(label, queries, repeat):
+    print(f"\n== {label} ==")
+    for name, queryset in queries.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+        print(f"\n{name}: {elapsed_ms:.3f} ms/query")
+        print(queryset.explain())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with test_database():
+        call_command("migrate", "teams", BEFORE_MIGRATION, verbosity=0)
+        apps = historical_apps(BEFORE_MIGRATION)
+        print(f"Populating {args.rows} members and invitations...")
+        team_ids, user_ids = populate(apps, args.rows)
+        queries = lookups(apps, team_ids, user_ids)
+        report(f"Before ({BEFORE_MIGRATION})", queries, args.repeat)
+
+        started = time.perf_counter()
+        call_command("migrate", "teams", AFTER_MIGRATION, verbosity=0)
+        print(f"\nBuilt indexes in {time.perf_counter() - started:.1f}s")
+        report(f"After ({AFTER_MIGRATION})", queries, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
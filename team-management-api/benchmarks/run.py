@@ -0,0 +1,222 @@
+"""
+Load-testing suite for the teams and auth API. Generates a dataset, runs each
+scenario through the full Django stack (middleware, cookie JWT auth, DRF), and
+reports latency percentiles, throughput and query counts per endpoint.
+
+Usage:
+    python -m benchmarks.run --iterations 200 --output results.json
+    python -m benchmarks.run --output new.json --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from itertools import cycle
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from users.serializers import CustomTokenObtainPairSerializer  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def access_cookie(user):
+    return {
+        settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]: str(
+            CustomTokenObtainPairSerializer.get_token(user).access_token
+        )
+    }
+
+
+def build_scenarios(dataset):
+    """Returns {name: request factory}, each factory returns the kwargs for one request."""
+    admin_cookies = access_cookie(dataset.admin)
+    teams = cycle(dataset.team_ids)
+    invitations = iter(dataset.pending_invitations)
+    invite_counter = iter(range(10**9))
+
+    def login(i):
+        return {
+            "method": "post",
+            "path": "/api/token/",
+            "data": {"email": dataset.admin.email, "password": datagen.PASSWORD},
+        }
+
+    def team_list(i):
+        return {"method": "get", "path": "/api/teams/", "cookies": admin_cookies}
+
+    def member_list(i):
+        return {
+            "method": "get",
+            "path": f"/api/teams/{next(teams)}/members/",
+            "cookies": admin_cookies,
+        }
+
+    def invite(i):
+        return {
+            "method": "post",
+            "path": "/api/team-invitations/",
+            "cookies": admin_cookies,
+            "data": {
+                "team": next(teams),
+                "email": f"invitee{next(invite_counter)}@example.com",
+                "first_name": "Invited",
+                "last_name": "User",
+                "phone_number": "+14155552671",
+                "role": dataset.regular_role.pk,
+            },
+        }
+
+    def accept(i):
+        invitation_id, user = next(invitations)
+        return {
+            "method": "post",
+            "path": f"/api/team-invitations/{invitation_id}/accept/",
+            "cookies": access_cookie(user),
+        }
+
+    return {
+        "login": login,
+        "team_list": team_list,
+        "member_list": member_list,
+        "invite": invite,
+        "accept": accept,
+    }
+
+
+def run_scenario(factory, iterations):
+    client = Client()
+    counter = QueryCounter()
+    latencies = []
+    errors = 0
+    with connection.execute_wrapper(counter):
+        for i in range(iterations):
+            request = factory(i)
+            client.cookies.clear()
+            for key, value in request.get("cookies", {}).items():
+                client.cookies[key] = value
+            method = getattr(client, request["method"])
+            started = time.perf_counter()
+            response = method(
+                request["path"], request.get("data"), content_type="application/json"
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": iterations,
+        "errors": errors,
+        "throughput_rps": round(iterations / sum(latencies), 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 3),
+            "p50": round(quantiles[49] * 1000, 3),
+            "p95": round(quantiles[94] * 1000, 3),
+            "p99": round(quantiles[98] * 1000, 3),
+        },
+        "queries_per_request": round(counter.count / iterations, 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, baseline=None):
+    header = f"{'scenario':<12} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'errors':>6}"
+    print(header)
+    for name, result in report["results"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<12} {result['throughput_rps']:>8} {latency['p50']:>8} "
+            f"{latency['p95']:>8} {latency['p99']:>8} "
+            f"{result['queries_per_request']:>8} {result['errors']:>6}"
+        )
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            p95_change = latency["p95"] / previous["latency_ms"]["p95"] - 1
+            queries_change = (
+                result["queries_per_request"] - previous["queries_per_request"]
+            )
+            print(f"{'':<12} p95 {p95_change:+.1%}, queries {queries_change:+.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--members-per-team", type=int, default=50)
+    parser.add_argument("--scenarios", nargs="*", help="Run only these scenarios.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument(
+        "--compare", help="Results JSON of a previous run to diff against."
+    )
+    args = parser.parse_args()
+
+    with test_database():
+        dataset = datagen.generate(
+            teams=args.teams,
+            members_per_team=args.members_per_team,
+            # Each accept iteration consumes one pending invitation
+            invitations_per_team=-(-args.iterations // args.teams),
+        )
+        scenarios = build_scenarios(dataset)
+        results = {}
+        for name, factory in scenarios.items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            results[name] = run_scenario(factory, args.iterations)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+            "platform": platform.platform(),
+        },
+        "config": {
+            "iterations": args.iterations,
+            "teams": args.teams,
+            "members_per_team": args.members_per_team,
+        },
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
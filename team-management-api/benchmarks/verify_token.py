@@ -0,0 +1,66 @@
+"""
+Micro-benchmark of POST /api/token/verify/, the endpoint the frontend calls on
+every route load. Reports requests/sec and queries per request, with the auth user
+cache disabled (the default, 1 query per request) and enabled (none once cached).
+
+Usage:
+    python -m benchmarks.verify_token --requests 5000
+"""
+
+import argparse
+import time
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+from users.serializers import CustomTokenObtainPairSerializer  # noqa: E402
+
+
+def run(client, requests):
+    # Warm up, and count the queries of a single request
+    client.post("/api/token/verify/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post("/api/token/verify/")
+    assert response.status_code == 200, response.content
+    # Read now, the next requests reset the queries log
+    query_count = len(queries)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.post("/api/token/verify/")
+    elapsed = time.perf_counter() - started
+
+    print(f"requests:          {requests}")
+    print(f"requests/sec:      {requests / elapsed:.0f}")
+    print(f"ms/request:        {elapsed * 1000 / requests:.3f}")
+    print(f"queries/request:   {query_count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    with test_database():
+        user = CustomUser.objects.create_user(
+            email="user@example.com", first_name="Ada", last_name="Lovelace"
+        )
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        client = Client()
+        client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]] = str(token)
+
+        print(f"== AUTH_USER_CACHE={settings.AUTH_USER_CACHE!r} ==")
+        run(client, args.requests)
+        with override_settings(AUTH_USER_CACHE="default"):
+            print("\n== AUTH_USER_CACHE='default' ==")
+            run(client, args.requests)
+
+
+if __name__ == "__main__":
+    main()
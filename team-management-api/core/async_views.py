@@ -0,0 +1,94 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's APIView, for read only endpoints served
+    under ASGI. Authenticates with the same classes as the sync views, and renders
+    DRF exceptions and data as JSON, so responses match the sync views'. Handlers
+    must be async.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    authentication_required = True
+    pagination_class = None
+    # Sync view serving the methods this view has no handler for, when it shares
+    # its route (eg. with a viewset's collection route)
+    sync_view = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if self.sync_view is not None and (
+            method == "options" or not hasattr(self, method)
+        ):
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+        try:
+            # Set by DRF's APIClient.force_authenticate in tests
+            user = getattr(request, "_force_auth_user", None)
+            if user is None:
+                user = await self.authenticate(request)
+            if user is None and self.authentication_required:
+                raise exceptions.NotAuthenticated()
+            request.user = user or AnonymousUser()
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as e:
+            return self.handle_exception(request, e)
+
+    async def authenticate(self, request):
+        """
+        Returns the user of the first authenticator that succeeds, or None, like
+        DRF. Authenticators with an async `aauthenticate` are awaited, the others
+        (eg. session, basic) run in a worker thread.
+        """
+        drf_request = Request(request)
+        for authenticator in self.get_authenticators():
+            if hasattr(authenticator, "aauthenticate"):
+                user_auth_tuple = await authenticator.aauthenticate(request)
+            else:
+                user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                    drf_request
+                )
+            if user_auth_tuple is not None:
+                return user_auth_tuple[0]
+        return None
+
+    def get_authenticators(self):
+        return [
+            authentication_class()
+            for authentication_class in self.authentication_classes
+        ]
+
+    def handle_exception(self, request, exc):
+        detail = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        response = JsonResponse(detail, status=exc.status_code)
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            # As APIView: 401 with the first authenticator's challenge, 403 without
+            authenticators = self.get_authenticators()
+            header = (
+                authenticators[0].authenticate_header(request)
+                if authenticators
+                else None
+            )
+            if header:
+                response["WWW-Authenticate"] = header
+            else:
+                response.status_code = exceptions.PermissionDenied.status_code
+        return response
+
+    async def paginate(self, queryset, serializer_class, context=None):
+        """
+        Returns the paginated response data of the queryset, fetched with the async
+        ORM by the paginator's apaginate_queryset. Serializers must not query.
+        """
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, Request(self.request), self)
+        data = serializer_class(page, many=True, context=context or {}).data
+        return paginator.get_paginated_response(data).data
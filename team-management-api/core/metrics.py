@@ -0,0 +1,95 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+Each worker process keeps its own registry, so scrape every worker (or run a single
+one) to get the full picture.
+"""
+
+import threading
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    HISTOGRAMS = {
+        "http_request_duration_seconds": ("Request wall time.", DURATION_BUCKETS),
+        "http_request_db_duration_seconds": (
+            "Time spent executing SQL per request.",
+            DURATION_BUCKETS,
+        ),
+        "http_request_db_queries": ("SQL queries per request.", QUERY_COUNT_BUCKETS),
+        "http_request_render_duration_seconds": (
+            "Time spent rendering the response body per request.",
+            DURATION_BUCKETS,
+        ),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = defaultdict(int)
+            self._histograms = {name: {} for name in self.HISTOGRAMS}
+
+    def observe_request(
+        self, view, method, status, duration, db_duration, db_queries, render_duration
+    ):
+        values = {
+            "http_request_duration_seconds": duration,
+            "http_request_db_duration_seconds": db_duration,
+            "http_request_db_queries": db_queries,
+            "http_request_render_duration_seconds": render_duration,
+        }
+        with self._lock:
+            self._requests[(view, method, str(status))] += 1
+            for name, value in values.items():
+                histograms = self._histograms[name]
+                if view not in histograms:
+                    histograms[view] = Histogram(self.HISTOGRAMS[name][1])
+                histograms[view].observe(value)
+
+    def render(self):
+        lines = [
+            "# HELP http_requests_total Requests by view, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            for (view, method, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'http_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}'
+                )
+            for name, (description, _) in self.HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for view, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(
+                            f'{name}_bucket{{view="{view}",le="{bound}"}} {count}'
+                        )
+                    lines.append(
+                        f'{name}_bucket{{view="{view}",le="+Inf"}} {histogram.count}'
+                    )
+                    lines.append(f'{name}_sum{{view="{view}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{view="{view}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,113 @@
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from .metrics import registry
+
+logger = logging.getLogger("core.requests")
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts and times queries, keeping the first SQL statements."""
+
+    def __init__(self, max_statements):
+        self.count = 0
+        self.duration = 0
+        self.statements = []
+        self.max_statements = max_statements
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if len(self.statements) < self.max_statements:
+                self.statements.append((elapsed, sql))
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, DB query count, DB time and response render time per resolved
+    URL name (eg. team-members-list), and logs slow requests along with their SQL.
+    Serializing inside the view (eg. `serializer.data`) is part of the wall time, not
+    of the DB or render time.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(settings.SLOW_REQUEST_MAX_LOGGED_QUERIES)
+        request._metrics_render_duration = 0
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        self.record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(settings.SLOW_REQUEST_MAX_LOGGED_QUERIES)
+        request._metrics_render_duration = 0
+        started = time.perf_counter()
+        # Queries of async views run in the request's sync thread, on that thread's
+        # connection, so the recorder is installed from there
+        wrapper = await sync_to_async(self.install_recorder)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrapper.__exit__)(None, None, None)
+        self.record(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    def install_recorder(self, recorder):
+        wrapper = connection.execute_wrapper(recorder)
+        wrapper.__enter__()
+        return wrapper
+
+    def record(self, request, response, recorder, duration):
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        registry.observe_request(
+            view,
+            request.method,
+            response.status_code,
+            duration,
+            recorder.duration,
+            recorder.count,
+            request._metrics_render_duration,
+        )
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            logger.warning(
+                "Slow request %s %s (%s): %.1fms, %d queries in %.1fms\n%s",
+                request.method,
+                request.path,
+                view,
+                duration * 1000,
+                recorder.count,
+                recorder.duration * 1000,
+                "\n".join(
+                    f"  [{elapsed * 1000:.1f}ms] {sql}"
+                    for elapsed, sql in recorder.statements
+                ),
+            )
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook
+        render_started = time.perf_counter()
+
+        def record_render_duration(response):
+            request._metrics_render_duration = time.perf_counter() - render_started
+
+        response.add_post_render_callback(record_render_duration)
+        return response
@@ -46,9 +46,11 @@ INSTALLED_APPS = [
     "corsheaders",
     "users",
     "teams",
+    "emails",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -61,6 +63,13 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "core.urls"
 
+# Route the read heavy endpoints to async views (see teams/async_views.py). Only
+# worth it when served by ASGI workers, under WSGI each request runs its own loop
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "False").lower() in (
+    "true",
+    "1",
+)
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -81,16 +90,104 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite")
 DB_PATH = os.path.join(BASE_DIR, "data", "db.sqlite3")
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        # Keeping sqlite for now, for easier/cheaper deployment
-        "NAME": DB_PATH,
+if DATABASE_ENGINE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "team_management"),
+            "USER": os.environ.get("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # Persistent connections, checked before reuse in each request
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+        }
     }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            # Keeping sqlite for now, for easier/cheaper deployment
+            "NAME": DB_PATH,
+            "OPTIONS": {
+                # WAL lets readers run alongside a writer, and writers wait on the
+                # lock instead of failing right away with "database is locked"
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    f"PRAGMA busy_timeout={os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)};"
+                ),
+                # Take the write lock when the transaction starts, so it can't fail
+                # upgrading from a read lock mid transaction
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+
+
+# Request metrics, see core.middleware.RequestMetricsMiddleware. Serializing inside
+# views isn't timed on its own, it's only part of the request wall time.
+# /internal/metrics/ is served to staff users, and to scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>" (empty to only allow staff users)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get("SLOW_REQUEST_THRESHOLD_MS", 500))
+SLOW_REQUEST_MAX_LOGGED_QUERIES = 50
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Member list responses (see teams/roster_cache.py), in memory or on disk. Memory
+# is per process, so with several workers use "file", shared by the workers of a host
+TEAM_ROSTER_CACHE_BACKEND = os.environ.get("TEAM_ROSTER_CACHE_BACKEND", "locmem")
+ROSTER_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "team-rosters",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "TEAM_ROSTER_CACHE_LOCATION", BASE_DIR / ".cache" / "team-rosters"
+        ),
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "rosters": {
+        **ROSTER_CACHE_BACKENDS[TEAM_ROSTER_CACHE_BACKEND],
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("TEAM_ROSTER_CACHE_MAX_ENTRIES", 5000))
+        },
+    },
 }
 
+# Cache alias used to share team permission maps across requests, empty to disable.
+# Must be a shared backend (eg. Redis, Memcached): invalidations only reach other
+# processes through it, and revoked permissions would otherwise linger until timeout
+TEAM_PERMISSIONS_CACHE = os.environ.get("TEAM_PERMISSIONS_CACHE", "")
+TEAM_PERMISSIONS_CACHE_TIMEOUT = int(
+    os.environ.get("TEAM_PERMISSIONS_CACHE_TIMEOUT", 300)
+)
+# Cache alias holding the version of the role catalog (see teams/roles.py), empty
+# to disable. Must be a shared backend (eg. Redis, Memcached) for role changes to
+# reach other workers right away, instead of on their next periodic reload
+TEAM_ROLES_CACHE = os.environ.get("TEAM_ROLES_CACHE", "")
+# Seconds the role catalog is kept in each process before being reloaded
+TEAM_ROLES_RELOAD_INTERVAL = int(os.environ.get("TEAM_ROLES_RELOAD_INTERVAL", 60))
+# Cache alias holding the member list responses ("rosters"), empty to disable.
+# Roster changes only reach the other workers through a shared backend: use the
+# locmem one when serving from a single process only, "file" otherwise
+TEAM_ROSTER_CACHE = os.environ.get("TEAM_ROSTER_CACHE", "")
+TEAM_ROSTER_CACHE_TIMEOUT = int(os.environ.get("TEAM_ROSTER_CACHE_TIMEOUT", 600))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -172,6 +269,13 @@ SIMPLE_JWT = {
     "TOKEN_VERIFY_SERIALIZER": "users.serializers.CustomTokenVerifySerializer",
 }
 
+# Cache alias used by CookieJWTAuthentication to cache authenticated users, empty to
+# disable. Must be a shared backend (eg. Redis, Memcached): invalidations only reach
+# other processes through it, and deactivated users would otherwise linger until timeout
+AUTH_USER_CACHE = os.environ.get("AUTH_USER_CACHE", "")
+# Seconds an authenticated user is cached for, 0 to disable
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
 # DRF Settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -181,6 +285,39 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
 }
+# Page sizes for the cursor paginated teams, members and invitations endpoints
+TEAMS_PAGE_SIZE = int(os.environ.get("TEAMS_PAGE_SIZE", 50))
+TEAMS_MAX_PAGE_SIZE = int(os.environ.get("TEAMS_MAX_PAGE_SIZE", 500))
+# Maximum number of invitees accepted by a single bulk invitation request
+TEAM_INVITATIONS_BULK_MAX_SIZE = int(
+    os.environ.get("TEAM_INVITATIONS_BULK_MAX_SIZE", 1000)
+)
+# Rows per query when exporting a roster, and rows invited per transaction when importing one
+TEAM_ROSTER_EXPORT_CHUNK_SIZE = int(
+    os.environ.get("TEAM_ROSTER_EXPORT_CHUNK_SIZE", 2000)
+)
+TEAM_ROSTER_IMPORT_BATCH_SIZE = int(
+    os.environ.get("TEAM_ROSTER_IMPORT_BATCH_SIZE", 500)
+)
+## Invitation expiry, see `python manage.py expire_invitations`
+TEAM_INVITATIONS_SWEEP_BATCH_SIZE = int(
+    os.environ.get("TEAM_INVITATIONS_SWEEP_BATCH_SIZE", 1000)
+)
+# Days expired and rejected invitations are kept before being purged
+TEAM_INVITATIONS_RETENTION_DAYS = int(
+    os.environ.get("TEAM_INVITATIONS_RETENTION_DAYS", 90)
+)
+
+# Phone numbers
+# Store phone numbers normalized to E.164 (eg. +14155552671)
+PHONE_NUMBER_E164 = os.environ.get("PHONE_NUMBER_E164", "False").lower() in (
+    "true",
+    "1",
+)
+# Load all the libphonenumber metadata on startup, instead of on the first validations
+PHONE_NUMBER_METADATA_WARM_UP = os.environ.get(
+    "PHONE_NUMBER_METADATA_WARM_UP", "True"
+).lower() in ("true", "1")
 
 # CORS
 CORS_ALLOWED_ORIGINS = os.environ.get(
@@ -199,5 +336,14 @@ RESEND_SMTP_USERNAME = os.environ.get("RESEND_SMTP_USERNAME")
 RESEND_SMTP_HOST = "smtp.resend.com"
 RESEND_SMTP_API_KEY = os.environ.get("RESEND_SMTP_API_KEY")
 FROM_EMAIL = os.environ.get("FROM_EMAIL")
+# Open SMTP connections kept by utils.emailsender, shared across threads
+EMAIL_CONNECTION_POOL_SIZE = int(os.environ.get("EMAIL_CONNECTION_POOL_SIZE", 2))
+## Outbox delivery, see `python manage.py send_queued_emails`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 100))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+# Seconds before the first retry, doubled on every further attempt
+EMAIL_OUTBOX_RETRY_DELAY = int(os.environ.get("EMAIL_OUTBOX_RETRY_DELAY", 60))
+# Seconds a worker has to send the batch it claimed, before other workers retry it
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.environ.get("EMAIL_OUTBOX_CLAIM_TIMEOUT", 600))
 
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:3000")
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from teams.models import Team, TeamMember, TeamRole
+from .metrics import registry
+
+User = get_user_model()
+
+
+@override_settings(METRICS_TOKEN="secret")
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(email="admin@example.com")
+        role = TeamRole.objects.create(
+            name="Admin", description="Admin", permissions=["members:view"]
+        )
+        self.team = Team.objects.create(name="Alpha", description="Alpha")
+        TeamMember.objects.create(team=self.team, user=self.user, role=role)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self, **headers):
+        return self.client.get("/internal/metrics/", **headers)
+
+    def test_records_metrics_per_url_name(self):
+        self.client.get(f"/api/teams/{self.team.pk}/members/")
+        self.client.get(f"/api/teams/{self.team.pk}/members/")
+
+        metrics = self.scrape(HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(metrics.status_code, 200)
+        body = metrics.content.decode()
+        self.assertIn(
+            'http_requests_total{view="team-members-list",method="GET",status="200"} 2',
+            body,
+        )
+        self.assertIn('http_request_db_queries_count{view="team-members-list"} 2', body)
+        self.assertIn(
+            'http_request_render_duration_seconds_count{view="team-members-list"} 2',
+            body,
+        )
+
+    def test_metrics_endpoint_is_internal(self):
+        self.assertEqual(self.scrape(REMOTE_ADDR="127.0.0.1").status_code, 403)
+        response = self.scrape(HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+
+    def test_staff_users_can_scrape_metrics(self):
+        staff = User.objects.create_user(email="staff@example.com", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.scrape().status_code, 200)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.assertLogs("core.requests", level="WARNING") as logs:
+            self.client.get(f"/api/teams/{self.team.pk}/members/")
+        self.assertIn("team-members-list", logs.output[0])
+        self.assertIn('FROM "teams_teammember"', logs.output[0])
@@ -17,9 +17,11 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
+from .views import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("internal/metrics/", metrics_view, name="metrics"),
     path("api/", include("users.urls")),
     path("api/", include("teams.urls")),
 ]
@@ -0,0 +1,91 @@
+import logging
+import smtplib
+import time
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.utils import timezone
+from emails.models import OutboxEmail
+from utils.emailsender import email_sender
+
+
+class Command(BaseCommand):
+    help = "Delivers queued emails from the outbox, retrying failed ones with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Maximum number of emails delivered per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls when running with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            while self.deliver_batch(options["batch_size"]) == options["batch_size"]:
+                pass
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def deliver_batch(self, batch_size):
+        # Claimed and recorded in short transactions, as SQLite's write lock is
+        # taken when a transaction starts and would block web writes while sending
+        emails = OutboxEmail.objects.claim(batch_size)
+        if not emails:
+            return 0
+        sent = 0
+        attempted = set()
+        try:
+            with email_sender.connection() as connection:
+                for email in emails:
+                    attempted.add(email.pk)
+                    try:
+                        email_sender.build_email(
+                            email.to,
+                            email.subject,
+                            email.html_body,
+                            email.plain_body,
+                            connection,
+                        ).send()
+                    except Exception as e:
+                        logging.exception("Failed to send queued email %s", email.pk)
+                        email.mark_failed(str(e))
+                        if isinstance(e, smtplib.SMTPServerDisconnected):
+                            connection.close()
+                            connection.open()
+                    else:
+                        email.mark_sent()
+                        sent += 1
+        except Exception as e:
+            # The connection could not be opened, retry the whole batch later
+            logging.exception("Failed to connect to the email server")
+            for email in emails:
+                if email.pk not in attempted:
+                    email.mark_failed(str(e))
+        now = timezone.now()
+        for email in emails:
+            email.updated_at = now
+        OutboxEmail.objects.bulk_update(
+            emails,
+            [
+                "status",
+                "attempts",
+                "sent_at",
+                "last_error",
+                "next_attempt_at",
+                "updated_at",
+            ],
+        )
+        self.stdout.write(f"Sent {sent} of {len(emails)} queued emails.")
+        return len(emails)
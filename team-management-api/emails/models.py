@@ -0,0 +1,117 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class OutboxEmailManager(models.Manager):
+    def enqueue(
+        self, to: str | list[str], subject: str, body: str, plain_body: str = ""
+    ):
+        recipients = to if isinstance(to, list) else [to]
+        return self.create(
+            to=recipients, subject=subject, html_body=body, plain_body=plain_body or ""
+        )
+
+    def enqueue_many(self, emails):
+        """Queues (to, subject, body, plain_body) tuples with a single insert."""
+        return self.bulk_create(
+            [
+                self.model(
+                    to=to if isinstance(to, list) else [to],
+                    subject=subject,
+                    html_body=body,
+                    plain_body=plain_body or "",
+                )
+                for to, subject, body, plain_body in emails
+            ]
+        )
+
+    def due(self):
+        """
+        Pending emails due for an attempt, and claimed ones whose claim expired
+        (eg. the worker sending them died).
+        """
+        return self.filter(
+            status__in=["pending", "sending"], next_attempt_at__lte=timezone.now()
+        )
+
+    def claim(self, batch_size):
+        """
+        Claims a batch of due emails for delivery, in a short transaction, so
+        they can be sent without holding locks. Claims expire after
+        EMAIL_OUTBOX_CLAIM_TIMEOUT seconds, after which other workers may retry.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Rows locked by another worker are skipped (no-op on SQLite)
+            emails = list(
+                self.due()
+                .select_for_update(skip_locked=True)
+                .order_by("next_attempt_at", "id")[:batch_size]
+            )
+            for email in emails:
+                email.status = "sending"
+                email.next_attempt_at = now + timedelta(
+                    seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+                )
+                email.updated_at = now
+            self.bulk_update(emails, ["status", "next_attempt_at", "updated_at"])
+        return emails
+
+
+class OutboxEmail(models.Model):
+    """
+    Durable queue of emails, written in the same transaction as the change that
+    triggers them, and delivered by the `send_queued_emails` command.
+    """
+
+    to = models.JSONField(default=list)
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+    plain_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ("pending", "Pending"),
+            ("sending", "Sending"),
+            ("sent", "Sent"),
+            ("failed", "Failed"),
+        ],
+        default="pending",
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OutboxEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="outbox_status_next_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{', '.join(self.to)} - {self.subject}"
+
+    def mark_sent(self):
+        self.status = "sent"
+        self.attempts += 1
+        self.sent_at = timezone.now()
+        self.last_error = ""
+
+    def mark_failed(self, error: str):
+        """Schedules a retry with exponential backoff, until the attempts run out."""
+        self.attempts += 1
+        self.last_error = error
+        if self.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            self.status = "failed"
+            return
+        self.status = "pending"
+        delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1)
+        self.next_attempt_at = timezone.now() + timedelta(seconds=delay)
@@ -0,0 +1,151 @@
+from io import StringIO
+from datetime import timedelta
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from utils.emailsender import EmailSender
+from .models import OutboxEmail
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP server unavailable")
+
+
+class AtomicDepthEmailBackend(LocmemEmailBackend):
+    depths = []
+
+    def send_messages(self, email_messages):
+        self.depths.append(len(connection.atomic_blocks))
+        return super().send_messages(email_messages)
+
+
+class FakeSMTP:
+    def __init__(self):
+        self.alive = True
+
+    def noop(self):
+        if not self.alive:
+            raise ConnectionResetError()
+        return (250, b"OK")
+
+
+class CountingEmailBackend(LocmemEmailBackend):
+    """Locmem backend that tracks the connections it opens, like the SMTP backend."""
+
+    opened = 0
+
+    def open(self):
+        if getattr(self, "connection", None) is not None:
+            return False
+        CountingEmailBackend.opened += 1
+        self.connection = FakeSMTP()
+        return True
+
+    def close(self):
+        self.connection = None
+
+
+@override_settings(EMAIL_BACKEND="emails.tests.CountingEmailBackend")
+class EmailSenderTests(TestCase):
+    def setUp(self):
+        CountingEmailBackend.opened = 0
+        self.sender = EmailSender(pool_size=2)
+
+    def test_connections_are_reused(self):
+        self.assertTrue(self.sender.send_email("one@example.com", "Hi", "<p>Hi</p>"))
+        self.assertTrue(self.sender.send_email("two@example.com", "Hi", "<p>Hi</p>"))
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_dropped_connections_are_reopened(self):
+        self.sender.send_email("one@example.com", "Hi", "<p>Hi</p>")
+        with self.sender.connection() as connection:
+            connection.connection.alive = False
+        self.sender.send_email("two@example.com", "Hi", "<p>Hi</p>")
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_send_many_uses_one_connection(self):
+        messages = [
+            self.sender.build_email(f"user{i}@example.com", "Hi", "<p>Hi</p>")
+            for i in range(5)
+        ]
+        self.assertEqual(self.sender.send_many(messages), 5)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+
+class SendQueuedEmailsTests(TestCase):
+    def send_queued_emails(self, *args):
+        call_command("send_queued_emails", *args, stdout=StringIO())
+
+    def test_delivers_due_emails(self):
+        OutboxEmail.objects.enqueue("one@example.com", "Hello", "<p>Hi <b>one</b></p>")
+        OutboxEmail.objects.enqueue(
+            ["two@example.com"], "Hello", "<p>Hi</p>", plain_body="Hi two"
+        )
+        later = OutboxEmail.objects.enqueue("three@example.com", "Later", "<p>Hi</p>")
+        later.next_attempt_at = timezone.now() + timedelta(hours=1)
+        later.save()
+
+        self.send_queued_emails("--batch-size", "1")
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ["one@example.com"])
+        self.assertEqual(mail.outbox[0].body, "Hi one")
+        self.assertEqual(mail.outbox[1].body, "Hi two")
+        self.assertEqual(OutboxEmail.objects.filter(status="sent").count(), 2)
+        self.assertEqual(OutboxEmail.objects.get(pk=later.pk).status, "pending")
+
+    @override_settings(EMAIL_BACKEND="emails.tests.AtomicDepthEmailBackend")
+    def test_emails_are_sent_outside_a_transaction(self):
+        OutboxEmail.objects.enqueue("one@example.com", "Hello", "<p>Hi</p>")
+        AtomicDepthEmailBackend.depths = []
+        self.send_queued_emails()
+        # No transaction other than the test's own
+        self.assertEqual(
+            AtomicDepthEmailBackend.depths, [len(connection.atomic_blocks)]
+        )
+        self.assertEqual(OutboxEmail.objects.get().status, "sent")
+
+    def test_expired_claims_are_delivered_again(self):
+        email = OutboxEmail.objects.enqueue("one@example.com", "Hello", "<p>Hi</p>")
+        claimed = OutboxEmail.objects.claim(10)
+        self.assertEqual([claimed_email.pk for claimed_email in claimed], [email.pk])
+        self.assertEqual(OutboxEmail.objects.claim(10), [])
+
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.send_queued_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "sent")
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(
+        EMAIL_BACKEND="emails.tests.FailingEmailBackend",
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+        EMAIL_OUTBOX_RETRY_DELAY=60,
+    )
+    def test_failed_emails_are_retried_with_backoff(self):
+        email = OutboxEmail.objects.enqueue("one@example.com", "Hello", "<p>Hi</p>")
+
+        with self.assertLogs(level="ERROR"):
+            self.send_queued_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "pending")
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "SMTP server unavailable")
+        self.assertGreater(
+            email.next_attempt_at, timezone.now() + timedelta(seconds=50)
+        )
+
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        with self.assertLogs(level="ERROR"):
+            self.send_queued_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertEqual(email.attempts, 2)
@@ -0,0 +1,71 @@
+"""
+Async variants of the read heavy endpoints, routed instead of the sync ones when
+ASYNC_READ_VIEWS is enabled (see teams/urls.py). Under ASGI workers, a request
+waiting on the database or cache no longer holds a worker.
+"""
+
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, PermissionDenied
+from core.async_views import AsyncAPIView
+from .members import amember_list_response, ateam_permissions_response
+from .models import TeamInvitation
+from .pagination import CreatedAtCursorPagination
+from .roles import role_registry
+from .serializers import (
+    TeamInvitationDetailSerializer,
+    TeamInvitationSerializer,
+    TeamMemberSerializer,
+)
+
+User = get_user_model()
+
+
+class TeamInvitationDetailAsyncView(AsyncAPIView):
+    authentication_required = False
+
+    async def get(self, request, invitation_id):
+        try:
+            invitation = await TeamInvitation.objects.select_related("team").aget(
+                id=invitation_id
+            )
+        except TeamInvitation.DoesNotExist:
+            raise NotFound("No TeamInvitation matches the given query.")
+        user_exists = await User.objects.filter(email=invitation.email).aexists()
+        serializer = TeamInvitationDetailSerializer(
+            invitation, context={"user_exists": user_exists}
+        )
+        return JsonResponse(serializer.data)
+
+
+class MyActiveInvitationsAsyncView(AsyncAPIView):
+    pagination_class = CreatedAtCursorPagination
+
+    async def get(self, request):
+        queryset = TeamInvitation.objects.filter(
+            email=request.user.email,
+            status="pending",
+            expires_at__gt=timezone.now(),
+        )
+        return JsonResponse(await self.paginate(queryset, TeamInvitationSerializer))
+
+
+class TeamMemberListAsyncView(AsyncAPIView):
+    """GET only, other methods go to `sync_view` (see teams/urls.py)."""
+
+    pagination_class = CreatedAtCursorPagination
+
+    async def get(self, request, team_pk):
+        return await amember_list_response(
+            request, int(team_pk), self.paginate_members, JsonResponse
+        )
+
+    async def paginate_members(self, queryset):
+        roles = await role_registry.aroles()
+        return await self.paginate(queryset, TeamMemberSerializer, {"roles": roles})
+
+
+class MyTeamPermissionsAsyncView(AsyncAPIView):
+    async def get(self, request, team_id):
+        return await ateam_permissions_response(request, team_id, JsonResponse)
@@ -0,0 +1,53 @@
+import functools
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import Context
+from django.template.loader import get_template
+
+INVITATION_SUBJECT = "You have been invited to a team"
+INVITATION_EXPIRY_DAYS = 15
+
+
+@functools.cache
+def _get_invitation_templates():
+    """The compiled (html, plain) invitation templates, loaded once per process."""
+    return (
+        get_template("teams/invitation_email.html").template,
+        get_template("teams/invitation_email.txt").template,
+    )
+
+
+@receiver(setting_changed)
+def clear_invitation_templates(setting, **kwargs):
+    if setting == "TEMPLATES":
+        _get_invitation_templates.cache_clear()
+
+
+def render_invitation_emails(invitations, inviter):
+    """
+    Returns the (html, plain) bodies of the invitation email for each invitation,
+    rendered in one pass that shares the compiled templates and the common context.
+    """
+    html_template, plain_template = _get_invitation_templates()
+    context = Context(
+        {
+            "inviter_name": inviter.get_full_name(),
+            "expiry_days": INVITATION_EXPIRY_DAYS,
+        }
+    )
+    bodies = []
+    for invitation in invitations:
+        with context.push(
+            team_name=invitation.team.name,
+            accept_url=invitation.get_accept_url(),
+            reject_url=invitation.get_reject_url(),
+        ):
+            bodies.append(
+                (html_template.render(context), plain_template.render(context))
+            )
+    return bodies
+
+
+def render_invitation_email(invitation, inviter):
+    """Returns the (html, plain) bodies of the invitation email."""
+    return render_invitation_emails([invitation], inviter)[0]
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from django.utils import timezone
+from emails.models import OutboxEmail
+from .emails import INVITATION_EXPIRY_DAYS, INVITATION_SUBJECT, render_invitation_emails
+from .models import TeamInvitation, TeamMember
+from .serializers import TeamInvitationBulkItemSerializer, TeamInvitationSerializer
+
+
+def invite_many(team, rows, inviter, roles):
+    """
+    Validates the invitee rows and invites the valid ones to the team, with one
+    query per kind of conflict (members, invitations), a single insert, and a
+    single insert of the queued emails. `roles` maps role ids to roles.
+
+    Returns one result per row, either {"status": "created", "invitation": ...}
+    or {"status": "error", "errors": ...}, and the number of invitations created.
+    """
+    results = []
+    valid_rows = []
+    for index, row in enumerate(rows):
+        item = TeamInvitationBulkItemSerializer(data=row, context={"roles": roles})
+        if item.is_valid():
+            valid_rows.append((index, item.validated_data))
+            results.append(None)
+        else:
+            results.append({"status": "error", "errors": item.errors})
+
+    emails = {data["email"] for _, data in valid_rows}
+    member_emails = TeamMember.objects.member_emails(team, emails)
+    invited_emails = TeamInvitation.objects.emails_with_pending_or_accepted_invitation(
+        team, emails
+    )
+
+    expires_at = timezone.now() + timedelta(days=INVITATION_EXPIRY_DAYS)
+    invitations = []
+    for index, data in valid_rows:
+        email = data["email"]
+        if email in member_emails:
+            error = "This user is already a member of the team."
+        elif email in invited_emails:
+            error = "There is already a pending or accepted invitation for this email and team."
+        else:
+            error = None
+        if error:
+            results[index] = {
+                "status": "error",
+                "errors": {"non_field_errors": [error]},
+            }
+            continue
+        # Later rows with the same email conflict with this one
+        invited_emails.add(email)
+        invitations.append(
+            (index, TeamInvitation(team=team, expires_at=expires_at, **data))
+        )
+
+    created = TeamInvitation.objects.bulk_create(
+        [invitation for _, invitation in invitations]
+    )
+    for (index, _), invitation in zip(invitations, created):
+        results[index] = {
+            "status": "created",
+            "invitation": TeamInvitationSerializer(invitation).data,
+        }
+    # Delivered by the send_queued_emails worker once the invitations are committed
+    OutboxEmail.objects.enqueue_many(
+        (invitation.email, INVITATION_SUBJECT, html_body, plain_body)
+        for invitation, (html_body, plain_body) in zip(
+            created, render_invitation_emails(created, inviter)
+        )
+    )
+    return results, len(created)
@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.utils import timezone
+from teams.models import TeamInvitation
+
+
+class Command(BaseCommand):
+    help = "Marks pending invitations past their expiry date as expired, and purges old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TEAM_INVITATIONS_SWEEP_BATCH_SIZE,
+            help="Maximum number of invitations updated or deleted per query.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.TEAM_INVITATIONS_RETENTION_DAYS,
+            help="Days expired and rejected invitations are kept for. 0 keeps them forever.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = TeamInvitation.objects.expire_invitations(
+            options["batch_size"], now=now
+        )
+        self.stdout.write(f"Expired {expired} invitations.")
+        if options["retention_days"] > 0:
+            purged = TeamInvitation.objects.purge_invitations(
+                now - timedelta(days=options["retention_days"]), options["batch_size"]
+            )
+            self.stdout.write(f"Purged {purged} invitations.")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from teams.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Indexes team members missing from the search index (eg. bulk created ones). "
+        "Cached member list pages of their teams are only dropped when the roster "
+        "cache is shared with the server (TEAM_ROSTER_CACHE_BACKEND=file, or a shared "
+        "backend), and otherwise expire after TEAM_ROSTER_CACHE_TIMEOUT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of members indexed per insert.",
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(options["batch_size"])
+        self.stdout.write(f"Indexed {indexed} team members.")
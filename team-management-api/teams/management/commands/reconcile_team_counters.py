@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from teams.models import Team
+
+
+class Command(BaseCommand):
+    help = "Repairs the member and manager counts of teams that drifted from their members."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of teams recounted per update.",
+        )
+
+    def handle(self, *args, **options):
+        fixed = Team.objects.reconcile_counters(options["batch_size"])
+        self.stdout.write(f"Fixed the counters of {fixed} teams.")
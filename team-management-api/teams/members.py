@@ -0,0 +1,146 @@
+"""
+Responses of the member list and my permissions endpoints, shared by the sync views
+and their async variants (see teams/async_views.py). The async ones query through
+the async ORM and cache API.
+"""
+
+from rest_framework.exceptions import NotAuthenticated, NotFound, PermissionDenied
+from .conditional import Validators, latest
+from .models import Team, TeamMember
+from .permissions import auser_has_team_permission, user_has_team_permission
+from .roster_cache import RosterPage
+from .search import filter_members
+
+MEMBERSHIP_FIELDS = (
+    "id",
+    "updated_at",
+    "role_id",
+    "role__updated_at",
+    "role__name",
+    "role__permissions",
+)
+
+
+def _permission_denied(user):
+    if not user.is_authenticated:
+        return NotAuthenticated()
+    return PermissionDenied()
+
+
+def _roster_page(request, team_id):
+    # Each page (cursor, page size, filters) is a different representation
+    return RosterPage(team_id, f"{request.get_host()}?{request.GET.urlencode()}")
+
+
+def _roster_validators(request, team_id, state):
+    return Validators(team_id, request.GET.urlencode(), *state.values())
+
+
+def _member_queryset(request, team_id):
+    return filter_members(
+        # Roles are served by the role registry
+        TeamMember.objects.filter(team_id=team_id).select_related("user"),
+        request.GET,
+    )
+
+
+def member_list_response(request, team_id, paginate, respond):
+    """
+    The member list of TeamMemberViewSet.list. Pages are served from the roster
+    cache when current, and `paginate(queryset)` returns the page data otherwise.
+    `respond(data)` builds the response.
+    """
+    if not user_has_team_permission(request.user, team_id, "members:view"):
+        raise _permission_denied(request.user)
+
+    cached_page = _roster_page(request, team_id)
+    cached = cached_page.get()
+    state = (
+        cached[0]
+        if cached is not None
+        else TeamMember.objects.roster_validators(team_id)
+    )
+    validators = _roster_validators(request, team_id, state)
+    not_modified = validators.not_modified_response(request)
+    if not_modified is not None:
+        return not_modified
+
+    if cached is not None:
+        data = cached[1]
+    else:
+        data = paginate(_member_queryset(request, team_id))
+        cached_page.set((state, data))
+    return validators.apply(respond(data))
+
+
+async def amember_list_response(request, team_id, apaginate, respond):
+    """Async counterpart of member_list_response, `apaginate` being async."""
+    if not await auser_has_team_permission(request.user, team_id, "members:view"):
+        raise _permission_denied(request.user)
+
+    cached_page = _roster_page(request, team_id)
+    cached = await cached_page.aget()
+    state = (
+        cached[0]
+        if cached is not None
+        else await TeamMember.objects.aroster_validators(team_id)
+    )
+    validators = _roster_validators(request, team_id, state)
+    not_modified = validators.not_modified_response(request)
+    if not_modified is not None:
+        return not_modified
+
+    if cached is not None:
+        data = cached[1]
+    else:
+        data = await apaginate(_member_queryset(request, team_id))
+        await cached_page.aset((state, data))
+    return validators.apply(respond(data))
+
+
+def _membership_queryset(user, team_id):
+    return TeamMember.objects.filter(team_id=team_id, user=user).values(
+        *MEMBERSHIP_FIELDS
+    )
+
+
+def _team_permissions_response(request, team_id, membership, respond):
+    validators = Validators(
+        membership["id"],
+        membership["updated_at"],
+        membership["role_id"],
+        membership["role__updated_at"],
+        last_modified=latest(membership["updated_at"], membership["role__updated_at"]),
+    )
+    not_modified = validators.not_modified_response(request)
+    if not_modified is not None:
+        return not_modified
+    return validators.apply(
+        respond(
+            {
+                "team": team_id,
+                "role": membership["role__name"],
+                "permissions": membership["role__permissions"],
+            }
+        )
+    )
+
+
+def team_permissions_response(request, team_id, respond):
+    """The role and permissions of the user in the team, of MyTeamPermissionsView."""
+    membership = _membership_queryset(request.user, team_id).first()
+    if membership is None:
+        if not Team.objects.filter(id=team_id).exists():
+            raise NotFound("Team not found.")
+        raise PermissionDenied("You are not a member of this team.")
+    return _team_permissions_response(request, team_id, membership, respond)
+
+
+async def ateam_permissions_response(request, team_id, respond):
+    """Async counterpart of team_permissions_response."""
+    membership = await _membership_queryset(request.user, team_id).afirst()
+    if membership is None:
+        if not await Team.objects.filter(id=team_id).aexists():
+            raise NotFound("Team not found.")
+        raise PermissionDenied("You are not a member of this team.")
+    return _team_permissions_response(request, team_id, membership, respond)
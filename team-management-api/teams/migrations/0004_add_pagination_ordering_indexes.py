@@ -0,0 +1,26 @@
+# Generated by Django 5.2.2 on 2026-10-18 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0003_create_team_invitation_table"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="team",
+            index=models.Index(
+                fields=["created_at", "id"], name="team_created_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teammember",
+            index=models.Index(
+                fields=["team", "created_at", "id"],
+                name="teammember_team_created_idx",
+            ),
+        ),
+    ]
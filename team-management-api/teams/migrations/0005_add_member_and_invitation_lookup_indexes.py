@@ -0,0 +1,91 @@
+# Generated by Django 5.2.2 on 2026-10-18 21:05
+
+import logging
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+# Permissions of the roles that can manage members (teams.models.MANAGE_MEMBERS_MASK)
+MANAGE_MEMBERS_PERMISSIONS = {"members:add", "members:update", "members:remove"}
+
+
+def remove_duplicate_members(apps, schema_editor):
+    """
+    Keeps one membership per (team, user) pair before adding the constraint: the
+    oldest one whose role can manage members, or the oldest one if none can.
+    """
+    TeamMember = apps.get_model("teams", "TeamMember")
+    duplicates = list(
+        TeamMember.objects.order_by()
+        .values("team_id", "user_id")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    duplicate_ids = []
+    for pair in duplicates:
+        members = list(
+            TeamMember.objects.filter(team_id=pair["team_id"], user_id=pair["user_id"])
+            .select_related("role")
+            .order_by("id")
+        )
+        kept = next(
+            (
+                member
+                for member in members
+                if MANAGE_MEMBERS_PERMISSIONS <= set(member.role.permissions or [])
+            ),
+            members[0],
+        )
+        removed = [member for member in members if member.pk != kept.pk]
+        duplicate_ids += [member.pk for member in removed]
+        logger.warning(
+            "Team %s, user %s: keeping membership %s (%s), removing %s",
+            pair["team_id"],
+            pair["user_id"],
+            kept.pk,
+            kept.role.name,
+            ", ".join(f"{member.pk} ({member.role.name})" for member in removed),
+        )
+    for start in range(0, len(duplicate_ids), BATCH_SIZE):
+        TeamMember.objects.filter(
+            id__in=duplicate_ids[start : start + BATCH_SIZE]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0004_add_pagination_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_members, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="teammember",
+            constraint=models.UniqueConstraint(
+                fields=["team", "user"], name="teammember_unique_team_user"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teaminvitation",
+            index=models.Index(
+                fields=["team", "email", "status"],
+                name="invitation_team_email_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teaminvitation",
+            index=models.Index(
+                fields=["team", "status", "expires_at"],
+                name="invitation_team_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teaminvitation",
+            index=models.Index(
+                fields=["email", "status", "expires_at"],
+                name="invitation_email_status_idx",
+            ),
+        ),
+    ]
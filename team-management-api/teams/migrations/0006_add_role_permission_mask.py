@@ -0,0 +1,42 @@
+# Generated by Django 5.2.2 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+# Frozen copy of teams.models.PERMISSIONS at the time of this migration
+PERMISSIONS = (
+    "team:view",
+    "team:update",
+    "team:delete",
+    "members:view",
+    "members:add",
+    "members:update",
+    "members:remove",
+    "members:leave",
+)
+
+
+def compile_permission_masks(apps, schema_editor):
+    TeamRole = apps.get_model("teams", "TeamRole")
+    roles = list(TeamRole.objects.all())
+    for role in roles:
+        role.permission_mask = 0
+        for permission in role.permissions or []:
+            if permission in PERMISSIONS:
+                role.permission_mask |= 1 << PERMISSIONS.index(permission)
+    TeamRole.objects.bulk_update(roles, ["permission_mask"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0005_add_member_and_invitation_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teamrole",
+            name="permission_mask",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(compile_permission_masks, migrations.RunPython.noop),
+    ]
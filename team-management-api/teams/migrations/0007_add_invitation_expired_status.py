@@ -0,0 +1,59 @@
+# Generated by Django 5.2.2 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0006_add_role_permission_mask"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="teaminvitation",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("accepted", "Accepted"),
+                    ("rejected", "Rejected"),
+                    ("expired", "Expired"),
+                ],
+                default="pending",
+                max_length=255,
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="teaminvitation",
+            name="invitation_team_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="teaminvitation",
+            name="invitation_email_status_idx",
+        ),
+        migrations.AddIndex(
+            model_name="teaminvitation",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["team", "expires_at"],
+                name="invitation_team_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teaminvitation",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["email", "expires_at"],
+                name="invitation_email_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teaminvitation",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["expires_at"],
+                name="invitation_pending_expiry_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.2 on 2026-10-18 14:20
+
+import django.db.models.deletion
+import phonenumbers
+from django.db import migrations, models
+
+FTS_TABLE = "teams_teammembersearch_fts"
+CONTENT_TABLE = "teams_teammembersearch"
+
+SQLITE_CREATE = [
+    # External content table, mirroring the documents through triggers, with
+    # prefix indexes for the first characters typed
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        document, content='{CONTENT_TABLE}', content_rowid='member_id',
+        prefix='1 2 3'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.member_id, new.document);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document)
+        VALUES ('delete', old.member_id, old.document);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE ON {CONTENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document)
+        VALUES ('delete', old.member_id, old.document);
+        INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.member_id, new.document);
+    END""",
+]
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""CREATE INDEX teammembersearch_trgm_idx ON {CONTENT_TABLE}
+        USING gin (document gin_trgm_ops)""",
+]
+POSTGRES_DROP = ["DROP INDEX IF EXISTS teammembersearch_trgm_idx"]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+def phone_number_terms(phone_number):
+    try:
+        parsed = phonenumbers.parse(phone_number)
+    except phonenumbers.NumberParseException:
+        return [phone_number]
+    return [phone_number, str(parsed.national_number)]
+
+
+def index_existing_members(apps, schema_editor):
+    TeamMember = apps.get_model("teams", "TeamMember")
+    TeamMemberSearch = apps.get_model("teams", "TeamMemberSearch")
+    members = TeamMember.objects.select_related("user").iterator(chunk_size=2000)
+    batch = []
+    for member in members:
+        user = member.user
+        terms = [user.first_name, user.last_name, user.email]
+        if user.phone_number:
+            terms += phone_number_terms(user.phone_number)
+        document = " ".join(filter(None, terms)).lower()
+        batch.append(TeamMemberSearch(member=member, document=document))
+        if len(batch) == 2000:
+            TeamMemberSearch.objects.bulk_create(batch)
+            batch = []
+    TeamMemberSearch.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0007_add_invitation_expired_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamMemberSearch",
+            fields=[
+                (
+                    "member",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search",
+                        serialize=False,
+                        to="teams.teammember",
+                    ),
+                ),
+                ("document", models.TextField()),
+            ],
+        ),
+        migrations.RunPython(
+            run({"sqlite": SQLITE_CREATE, "postgresql": POSTGRES_CREATE}),
+            run({"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}),
+        ),
+        migrations.RunPython(index_existing_members, migrations.RunPython.noop),
+    ]
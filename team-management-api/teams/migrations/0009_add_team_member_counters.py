@@ -0,0 +1,51 @@
+# Generated by Django 5.2.2 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+# Bits of members:add, members:update and members:remove in teams.models.PERMISSIONS
+MANAGE_MEMBERS_MASK = 0b1110000
+
+
+def count_team_members(apps, schema_editor):
+    Team = apps.get_model("teams", "Team")
+    TeamMember = apps.get_model("teams", "TeamMember")
+    members = TeamMember.objects.filter(team=models.OuterRef("pk"))
+    managers = members.alias(
+        granted=models.F("role__permission_mask").bitand(MANAGE_MEMBERS_MASK)
+    ).filter(granted=MANAGE_MEMBERS_MASK)
+    # A single UPDATE of all the teams
+    Team.objects.update(member_count=count(members), manager_count=count(managers))
+
+
+def count(queryset):
+    return Coalesce(
+        models.Subquery(
+            queryset.order_by()
+            .values("team")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0008_add_member_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="team",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="manager_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_team_members, migrations.RunPython.noop),
+    ]
@@ -1,49 +1,262 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from utils.validators.phone_number_validator import PhoneNumberValidator
 
 UserModel = get_user_model()
 
 
+class TeamManager(models.Manager):
+    def count_member(self, team_id, role_id, delta):
+        """
+        Adds delta to the team's member count, and to its manager count if the
+        role can manage members, in place so it's safe under concurrent writers.
+        The role is read by the same UPDATE, not from the role registry which may
+        be stale. Clamped at 0, so counters that drifted below their rows can't
+        fail deletes.
+        """
+        manages = TeamRole.objects.filter(pk=role_id).alias(
+            granted=models.F("permission_mask").bitand(MANAGE_MEMBERS_MASK)
+        )
+        self.filter(pk=team_id).update(
+            member_count=Greatest(models.F("member_count") + delta, 0),
+            manager_count=Greatest(
+                models.F("manager_count")
+                + models.Case(
+                    models.When(
+                        models.Exists(manages.filter(granted=MANAGE_MEMBERS_MASK)),
+                        then=delta,
+                    ),
+                    default=0,
+                ),
+                0,
+            ),
+        )
+
+    def recount(self, team_ids, *counters):
+        """
+        Recomputes the counters of the given teams (all of them, or the given
+        ones) from their TeamMember rows.
+        """
+        actual = _actual_counters()
+        return self.filter(pk__in=team_ids).update(
+            **{name: actual[name] for name in counters or actual}
+        )
+
+    def reconcile_counters(self, batch_size):
+        """
+        Recounts the teams whose counters drifted (eg. after bulk operations
+        skipping signals), by batches. Returns the number of teams fixed.
+        """
+        drifted = (
+            self.alias(
+                **{f"actual_{name}": e for name, e in _actual_counters().items()}
+            )
+            .exclude(
+                member_count=models.F("actual_member_count"),
+                manager_count=models.F("actual_manager_count"),
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        fixed = 0
+        last_id = 0
+        while team_ids := list(drifted.filter(pk__gt=last_id)[:batch_size]):
+            fixed += self.recount(team_ids)
+            last_id = team_ids[-1]
+        return fixed
+
+
+def _actual_counters():
+    members = TeamMember.objects.filter(team=models.OuterRef("pk"))
+    managers = members.alias(
+        granted=models.F("role__permission_mask").bitand(MANAGE_MEMBERS_MASK)
+    ).filter(granted=MANAGE_MEMBERS_MASK)
+    return {"member_count": _count(members), "manager_count": _count(managers)}
+
+
+def _count(queryset):
+    return Coalesce(
+        models.Subquery(
+            queryset.order_by()
+            .values("team")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
 class Team(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
+    # Denormalized counts of TeamMember rows, maintained by teams.signals and
+    # repaired by `python manage.py reconcile_team_counters`
+    member_count = models.PositiveIntegerField(default=0)
+    manager_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TeamManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="team_created_at_id_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
 
+# Registry of the known team permissions. Each permission owns the bit at its
+# index in TeamRole.permission_mask, so new permissions must be appended, never
+# reordered or removed.
+PERMISSIONS = (
+    "team:view",
+    "team:update",
+    "team:delete",
+    "members:view",
+    "members:add",
+    "members:update",
+    "members:remove",
+    "members:leave",
+)
+PERMISSION_BITS = {permission: 1 << bit for bit, permission in enumerate(PERMISSIONS)}
+
+
+def compile_permissions(permissions):
+    """Compiles a list of permission strings into a bitmask."""
+    mask = 0
+    for permission in permissions:
+        try:
+            mask |= PERMISSION_BITS[permission]
+        except KeyError:
+            raise ValueError(f"Unknown team permission: {permission}")
+    return mask
+
+
+def mask_has_permissions(mask, *permissions):
+    required = compile_permissions(permissions)
+    return mask & required == required
+
+
+MANAGE_MEMBERS_MASK = compile_permissions(
+    ["members:add", "members:update", "members:remove"]
+)
+
+
+class TeamRoleQuerySet(models.QuerySet):
+    def with_permissions(self, *permissions):
+        """Roles having all the given permissions, filtered with a bitwise predicate."""
+        required = compile_permissions(permissions)
+        return self.alias(granted=models.F("permission_mask").bitand(required)).filter(
+            granted=required
+        )
+
+
 class TeamRole(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     permissions = models.JSONField(default=list)
+    # Compiled from `permissions` on save. Bulk operations must set it themselves.
+    permission_mask = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TeamRoleQuerySet.as_manager()
+
     def __str__(self):
         return self.name
-    
+
+    def clean(self):
+        try:
+            compile_permissions(self.permissions)
+        except ValueError as e:
+            raise ValidationError({"permissions": str(e)})
+
+    def save(self, *args, **kwargs):
+        self.permission_mask = compile_permissions(self.permissions)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "permissions" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "permission_mask"}
+        super().save(*args, **kwargs)
+
+    def has_permission(self, permission):
+        return mask_has_permissions(self.permission_mask, permission)
+
     def can_manage_members(self):
-        permissions = ["members:add", "members:update", "members:remove"]
-        return all(permission in self.permissions for permission in permissions)
+        return self.permission_mask & MANAGE_MEMBERS_MASK == MANAGE_MEMBERS_MASK
+
+
+ROSTER_AGGREGATES = {
+    "count": models.Count("id"),
+    "max_id": models.Max("id"),
+    "members_updated_at": models.Max("updated_at"),
+    "users_updated_at": models.Max("user__updated_at"),
+    "roles_updated_at": models.Max("role__updated_at"),
+}
 
 
 class TeamMemberManager(models.Manager):
     def is_user_member(self, team, email):
         return self.filter(team=team, user__email=email).exists()
 
-    def is_last_admin(self, team_member):
-        if not team_member.role.can_manage_members():
+    def roster_validators(self, team_id):
+        """Aggregates that change whenever the team's roster (members, roles) changes."""
+        return self.filter(team_id=team_id).aggregate(**ROSTER_AGGREGATES)
+
+    async def aroster_validators(self, team_id):
+        return await self.filter(team_id=team_id).aaggregate(**ROSTER_AGGREGATES)
+
+    def member_emails(self, team, emails):
+        """Returns which of the given emails belong to members of the team."""
+        return set(
+            self.filter(team=team, user__email__in=emails).values_list(
+                "user__email", flat=True
+            )
+        )
+
+    def with_role_permissions(self, *permissions):
+        """Members whose role has all the given permissions."""
+        required = compile_permissions(permissions)
+        return self.alias(
+            granted=models.F("role__permission_mask").bitand(required)
+        ).filter(granted=required)
+
+    def managers(self, team):
+        """Members of the team that can manage members, whatever their role."""
+        return self.with_role_permissions(
+            "members:add", "members:update", "members:remove"
+        ).filter(team=team)
+
+    def is_last_admin(self, team_member, lock=False):
+        """
+        Whether the member is the only one of their team able to manage members,
+        read from Team.manager_count. With lock, the team's row is locked until
+        commit, which serializes the check with the writers of the counter.
+        Counters that drifted are repaired by reconcile_team_counters.
+        """
+        teams = Team.objects.filter(pk=team_member.team_id)
+        if lock:
+            teams = teams.select_for_update()
+        manager_count = teams.values_list("manager_count", flat=True).get()
+        return manager_count <= 1 and team_member.role.can_manage_members()
+
+    @transaction.atomic
+    def remove_member(self, team_member):
+        """
+        Deletes the member unless they're the last one able to manage the team's
+        members, returning whether it was deleted. Two admins removing each other
+        at the same time can't leave the team without one, as the check locks the
+        team's row.
+        """
+        if self.is_last_admin(team_member, lock=True):
             return False
-        admin_count = self.filter(
-            team=team_member.team,
-            role=team_member.role
-        ).count()
-        return admin_count <= 1
+        team_member.delete()
+        return True
 
 
 class TeamMember(models.Model):
@@ -55,19 +268,91 @@ class TeamMember(models.Model):
 
     objects = TeamMemberManager()
 
+    class Meta:
+        constraints = [
+            # Also serves the (team, user) lookups done on every permission check
+            models.UniqueConstraint(
+                fields=["team", "user"], name="teammember_unique_team_user"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["team", "created_at", "id"],
+                name="teammember_team_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.team.name}"
 
 
+class TeamMemberSearch(models.Model):
+    """
+    Searchable text of a member (name, email and phone, lowercased), kept in sync
+    by teams.signals. Indexed with FTS5 on SQLite and pg_trgm on PostgreSQL (see
+    migration 0008 and teams.search).
+    """
+
+    member = models.OneToOneField(
+        TeamMember, on_delete=models.CASCADE, primary_key=True, related_name="search"
+    )
+    document = models.TextField()
+
+    def __str__(self):
+        return self.document
+
+
 class TeamInvitationManager(models.Manager):
     def has_pending_or_accepted_invitation(self, team, email):
         return self.filter(
             team=team, email=email, status__in=["pending", "accepted"]
         ).exists()
 
+    def emails_with_pending_or_accepted_invitation(self, team, emails):
+        return set(
+            self.filter(
+                team=team, email__in=emails, status__in=["pending", "accepted"]
+            ).values_list("email", flat=True)
+        )
+
     def active_invitations_for_team(self, team):
         return self.filter(team=team, status="pending", expires_at__gt=timezone.now())
 
+    def expire_invitations(self, batch_size, now=None):
+        """
+        Moves pending invitations past their expiry date to "expired", one batch at
+        a time so writers aren't blocked for long. Returns the number expired.
+        """
+        now = now or timezone.now()
+        expired = 0
+        while True:
+            ids = list(
+                self.filter(status="pending", expires_at__lte=now).values_list(
+                    "id", flat=True
+                )[:batch_size]
+            )
+            if not ids:
+                return expired
+            expired += self.filter(id__in=ids, status="pending").update(
+                status="expired", updated_at=now
+            )
+
+    def purge_invitations(self, before, batch_size):
+        """
+        Deletes expired and rejected invitations last updated before the given date.
+        Accepted ones are kept, as they record how members joined.
+        """
+        purged = 0
+        while True:
+            ids = list(
+                self.filter(
+                    status__in=["expired", "rejected"], updated_at__lt=before
+                ).values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return purged
+            purged += self.filter(id__in=ids).delete()[0]
+
 
 class TeamInvitation(models.Model):
     team = models.ForeignKey(Team, on_delete=models.CASCADE)
@@ -82,6 +367,7 @@ class TeamInvitation(models.Model):
             ("pending", "Pending"),
             ("accepted", "Accepted"),
             ("rejected", "Rejected"),
+            ("expired", "Expired"),
         ],
         default="pending",
     )
@@ -91,9 +377,48 @@ class TeamInvitation(models.Model):
 
     objects = TeamInvitationManager()
 
+    class Meta:
+        indexes = [
+            # has_pending_or_accepted_invitation
+            models.Index(
+                fields=["team", "email", "status"],
+                name="invitation_team_email_idx",
+            ),
+            # Partial indexes over pending invitations only, which stay few as
+            # expired ones are swept (see `manage.py expire_invitations`).
+            # active_invitations_for_team
+            models.Index(
+                fields=["team", "expires_at"],
+                name="invitation_team_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+            # Invitations for the current user (MyActiveInvitationsView)
+            models.Index(
+                fields=["email", "expires_at"],
+                name="invitation_email_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+            # expire_invitations
+            models.Index(
+                fields=["expires_at"],
+                name="invitation_pending_expiry_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.email} - {self.team.name}"
 
+    def expire_if_due(self):
+        """
+        Marks the invitation expired if it's pending past its expiry date, which
+        expire_invitations may not have swept yet. Returns whether it has expired.
+        """
+        if self.status == "pending" and self.expires_at <= timezone.now():
+            self.status = "expired"
+            self.save(update_fields=["status", "updated_at"])
+        return self.status == "expired"
+
     def get_accept_url(self):
         return f"{settings.FRONTEND_URL}/accept-invitation/{self.id}"
 
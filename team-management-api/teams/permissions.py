@@ -1,13 +1,114 @@
+from django.conf import settings
+from django.core.cache import caches
 from rest_framework.permissions import BasePermission
-from .models import TeamMember
+from .models import PERMISSION_BITS, Team, TeamMember
 
+# Bumped on every membership/role change in this process, so a permission map
+# memoized on a long-lived user instance (eg. tests reusing the same user) is
+# never served stale.
+_generation = 0
 
-def user_has_team_permission(user, team, permission):
-    try:
-        team_member = TeamMember.objects.get(team=team, user=user)
-    except TeamMember.DoesNotExist:
+CACHE_KEY_PREFIX = "teams:permission-masks"
+
+
+def _get_shared_cache():
+    alias = settings.TEAM_PERMISSIONS_CACHE
+    if not alias:
+        return None
+    return caches[alias]
+
+
+def _cache_key(user_id):
+    return f"{CACHE_KEY_PREFIX}:{user_id}"
+
+
+def _team_permissions_queryset(user):
+    return TeamMember.objects.filter(user=user).values_list(
+        "team_id", "role__permission_mask"
+    )
+
+
+def _memoized_team_permissions(user):
+    memoized = getattr(user, "_team_permissions", None)
+    if memoized is not None and memoized[0] == _generation:
+        return memoized[1]
+    return None
+
+
+def get_user_team_permissions(user):
+    """
+    Returns a {team_id: permission_mask} map for the user.
+    The map is loaded once per user instance (ie. once per request), and shared
+    across requests through the configured cache backend, if any.
+    """
+    if not user or not user.is_authenticated:
+        return {}
+    memoized = _memoized_team_permissions(user)
+    if memoized is not None:
+        return memoized
+
+    generation = _generation
+    cache = _get_shared_cache()
+    permissions = cache.get(_cache_key(user.pk)) if cache is not None else None
+    if permissions is None:
+        permissions = dict(_team_permissions_queryset(user))
+        if cache is not None:
+            cache.set(
+                _cache_key(user.pk),
+                permissions,
+                settings.TEAM_PERMISSIONS_CACHE_TIMEOUT,
+            )
+    user._team_permissions = (generation, permissions)
+    return permissions
+
+
+async def aget_user_team_permissions(user):
+    """Async counterpart of get_user_team_permissions, for async views."""
+    if not user or not user.is_authenticated:
+        return {}
+    memoized = _memoized_team_permissions(user)
+    if memoized is not None:
+        return memoized
+
+    generation = _generation
+    cache = _get_shared_cache()
+    permissions = await cache.aget(_cache_key(user.pk)) if cache is not None else None
+    if permissions is None:
+        permissions = {
+            team_id: mask async for team_id, mask in _team_permissions_queryset(user)
+        }
+        if cache is not None:
+            await cache.aset(
+                _cache_key(user.pk),
+                permissions,
+                settings.TEAM_PERMISSIONS_CACHE_TIMEOUT,
+            )
+    user._team_permissions = (generation, permissions)
+    return permissions
+
+
+def invalidate_user_team_permissions(*user_ids):
+    global _generation
+    _generation += 1
+    cache = _get_shared_cache()
+    if cache is not None and user_ids:
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def _has_permission(permissions, team, permission):
+    team_id = team.pk if isinstance(team, Team) else team
+    mask = permissions.get(team_id)
+    if mask is None:
         return False
-    return permission in (team_member.role.permissions or [])
+    return bool(mask & PERMISSION_BITS[permission])
+
+
+def user_has_team_permission(user, team, permission):
+    return _has_permission(get_user_team_permissions(user), team, permission)
+
+
+async def auser_has_team_permission(user, team, permission):
+    return _has_permission(await aget_user_team_permissions(user), team, permission)
 
 
 class HasTeamPermission(BasePermission):
@@ -16,20 +117,22 @@ class HasTeamPermission(BasePermission):
     Works with Team objects and objects with a team attribute.
     """
 
-    def get_team(self, obj):
+    def get_team_id(self, obj):
         # Handle Team objects
-        if hasattr(obj, "pk") and obj.__class__.__name__ == "Team":
-            return obj
-        # Handle Objects with a team attribute
+        if isinstance(obj, Team):
+            return obj.pk
+        # Handle Objects with a team attribute, avoiding a query for the team itself
+        if hasattr(obj, "team_id"):
+            return obj.team_id
         if hasattr(obj, "team"):
-            return obj.team
+            return obj.team.pk
         return None
 
     def has_object_permission(self, request, view, obj):
         required_permission = getattr(view, "required_permission", None)
         if not required_permission:
             return True
-        team = self.get_team(obj)
-        if team is None:
+        team_id = self.get_team_id(obj)
+        if team_id is None:
             return False
-        return user_has_team_permission(request.user, team, required_permission)
+        return user_has_team_permission(request.user, team_id, required_permission)
@@ -0,0 +1,123 @@
+"""
+Process-level registry of the TeamRole catalog. Roles change almost never, so all
+of them are loaded once and served by id or name without querying, and reloaded
+when teams.signals invalidates the registry on a role save or delete.
+
+Signals only reach the process that saved the role. Other workers reload the
+catalog every TEAM_ROLES_RELOAD_INTERVAL seconds, or right away when
+TEAM_ROLES_CACHE names a shared cache backend (eg. Redis or Memcached) holding a
+catalog version, checked on each access.
+
+Invalidations apply right away, and again once the transaction commits, so a
+catalog loaded before the commit isn't kept as current.
+"""
+
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .models import TeamRole
+
+VERSION_CACHE_KEY = "teams:roles:version"
+
+
+def _get_shared_cache():
+    alias = settings.TEAM_ROLES_CACHE
+    if not alias:
+        return None
+    return caches[alias]
+
+
+class RoleRegistry:
+    def __init__(self):
+        self._version = None
+        self._loaded_at = None
+        self._roles = None
+        self._roles_by_name = None
+
+    def _shared_version(self, cache):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            # Never expires, so versions keep increasing while the cache is up
+            cache.add(VERSION_CACHE_KEY, 1, None)
+            version = cache.get(VERSION_CACHE_KEY, 1)
+        return version
+
+    async def _ashared_version(self, cache):
+        version = await cache.aget(VERSION_CACHE_KEY)
+        if version is None:
+            await cache.aadd(VERSION_CACHE_KEY, 1, None)
+            version = await cache.aget(VERSION_CACHE_KEY, 1)
+        return version
+
+    def _is_stale(self, version):
+        return (
+            self._roles is None
+            or version != self._version
+            or time.monotonic() - self._loaded_at >= settings.TEAM_ROLES_RELOAD_INTERVAL
+        )
+
+    def _set(self, roles, version):
+        self._roles_by_name = {role.name: role for role in roles.values()}
+        self._roles = roles
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def _load(self, version):
+        self._set(TeamRole.objects.in_bulk(), version)
+
+    def roles(self):
+        """Returns the {id: TeamRole} catalog, reloading it if invalidated."""
+        cache = _get_shared_cache()
+        version = self._shared_version(cache) if cache is not None else None
+        if self._is_stale(version):
+            self._load(version)
+        return self._roles
+
+    async def aroles(self):
+        """Async counterpart of roles, for async views."""
+        cache = _get_shared_cache()
+        version = await self._ashared_version(cache) if cache is not None else None
+        if self._is_stale(version):
+            self._set({role.pk: role async for role in TeamRole.objects.all()}, version)
+        return self._roles
+
+    def get(self, pk):
+        """
+        Returns the role with the given id. Unknown ids reload the catalog once, in
+        case the role was created by another process.
+        """
+        role = self.roles().get(pk)
+        if role is None:
+            self._load(self._version)
+            role = self._roles.get(pk)
+        if role is None:
+            raise TeamRole.DoesNotExist(f"No TeamRole with id {pk}.")
+        return role
+
+    def get_by_name(self, name):
+        self.roles()
+        role = self._roles_by_name.get(name)
+        if role is None:
+            self._load(self._version)
+            role = self._roles_by_name.get(name)
+        if role is None:
+            raise TeamRole.DoesNotExist(f"No TeamRole named {name!r}.")
+        return role
+
+    def invalidate(self):
+        def bump():
+            self._roles = None
+            cache = _get_shared_cache()
+            if cache is not None:
+                try:
+                    cache.incr(VERSION_CACHE_KEY)
+                except ValueError:
+                    # Not set yet, nothing was loaded against a shared version
+                    pass
+
+        bump()
+        transaction.on_commit(bump)
+
+
+role_registry = RoleRegistry()
@@ -0,0 +1,135 @@
+"""
+Roster import and export, in CSV or JSON Lines. Both stream: exports are written
+row by row while members are fetched in chunks, and imports are parsed and
+invited one batch of rows at a time, so memory stays flat whatever the team size.
+"""
+
+import codecs
+import csv
+import itertools
+import json
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import TeamMember
+
+FILE_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+}
+# Exported columns, the first ones being the ones read back on import
+ROSTER_FIELDS = [
+    "email",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "role",
+    "joined_at",
+]
+
+# Spreadsheets evaluate cells starting with these as formulas. They're prefixed
+# with a quote on export, and the quote dropped again on import
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class RosterFormatError(ValueError):
+    pass
+
+
+def _escape_formula(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _unescape_formula(value):
+    if (
+        isinstance(value, str)
+        and value[:1] == "'"
+        and value[1:].startswith(FORMULA_PREFIXES)
+    ):
+        return value[1:]
+    return value
+
+
+class _Echo:
+    """Pseudo buffer handing back what csv.writer writes, so rows can be streamed."""
+
+    def write(self, value):
+        return value
+
+
+def export_roster(team_id, file_format, chunk_size):
+    """Yields the team's members as CSV or JSONL, one row at a time."""
+    members = (
+        TeamMember.objects.filter(team_id=team_id)
+        .order_by("created_at", "id")
+        .values_list(
+            "user__email",
+            "user__first_name",
+            "user__last_name",
+            "user__phone_number",
+            "role__name",
+            "created_at",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    if file_format == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(ROSTER_FIELDS)
+        for member in members:
+            yield writer.writerow([_escape_formula(value) for value in member])
+    else:
+        encoder = DjangoJSONEncoder()
+        for member in members:
+            yield encoder.encode(dict(zip(ROSTER_FIELDS, member))) + "\n"
+
+
+async def aexport_roster(team_id, file_format, chunk_size):
+    """
+    Async iterator over export_roster, for ASGI, which would otherwise buffer a
+    sync iterator whole. Rows are read chunk by chunk from the request's thread.
+    """
+    rows = export_roster(team_id, file_format, chunk_size)
+    next_rows = sync_to_async(lambda: list(itertools.islice(rows, chunk_size)))
+    while chunk := await next_rows():
+        yield "".join(chunk)
+
+
+def read_roster(upload, file_format, role_ids_by_name):
+    """
+    Yields the rows of an uploaded roster as dicts, decoding the file line by line.
+    Roles may be given by name (as exported) or id.
+    """
+    lines = codecs.iterdecode(upload, "utf-8-sig")
+    if file_format == "csv":
+        rows = (
+            {key: _unescape_formula(value) for key, value in row.items()}
+            for row in csv.DictReader(lines)
+        )
+    else:
+        rows = (_parse_json_line(number, line) for number, line in enumerate(lines, 1))
+    for row in rows:
+        if row is None:
+            continue
+        role = row.get("role")
+        if isinstance(role, str) and role in role_ids_by_name:
+            row["role"] = role_ids_by_name[role]
+        yield row
+
+
+def _parse_json_line(number, line):
+    if not line.strip():
+        return None
+    try:
+        row = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise RosterFormatError(f"Line {number} is not valid JSON: {e}")
+    if not isinstance(row, dict):
+        raise RosterFormatError(f"Line {number} is not a JSON object.")
+    return row
+
+
+def batched(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, batch_size)):
+        yield batch
@@ -0,0 +1,97 @@
+"""
+Versioned cache of the member list responses. Pages are keyed by the team's
+roster version, a random stamp replaced by teams.signals whenever a member joins,
+leaves, changes role or edits their profile, so a stale page is never read back
+and is left to expire instead of being deleted.
+
+Versions are replaced right away, and again once the transaction commits, so a
+page read before the commit can't be cached under the new version.
+"""
+
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_CACHE_KEY_PREFIX = "teams:roster-version"
+PAGE_CACHE_KEY_PREFIX = "teams:roster-page"
+
+
+def _get_cache():
+    alias = settings.TEAM_ROSTER_CACHE
+    if not alias:
+        return None
+    return caches[alias]
+
+
+def _version_key(team_id):
+    return f"{VERSION_CACHE_KEY_PREFIX}:{team_id}"
+
+
+def _get_roster_version(cache, team_id):
+    version = cache.get(_version_key(team_id))
+    if version is None:
+        # A new random version, rather than a counter restarting at 1 when the
+        # version is evicted, keeps pages cached under previous versions unreachable
+        cache.add(_version_key(team_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(team_id))
+    return version
+
+
+async def _aget_roster_version(cache, team_id):
+    version = await cache.aget(_version_key(team_id))
+    if version is None:
+        await cache.aadd(_version_key(team_id), uuid.uuid4().hex, None)
+        version = await cache.aget(_version_key(team_id))
+    return version
+
+
+def bump_roster_versions(*team_ids):
+    cache = _get_cache()
+    if cache is None or not team_ids:
+        return
+
+    def bump():
+        cache.set_many(
+            {_version_key(team_id): uuid.uuid4().hex for team_id in team_ids}, None
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class RosterPage:
+    """
+    Cache entry of one page of a team's member list. `page_key` identifies the
+    page (query string, host for the pagination links). The page is keyed by the
+    roster version current when it's read, with get or aget.
+    """
+
+    def __init__(self, team_id, page_key):
+        self.cache = _get_cache()
+        self.team_id = team_id
+        self.digest = hashlib.md5(page_key.encode()).hexdigest()
+
+    def _key(self, version):
+        return f"{PAGE_CACHE_KEY_PREFIX}:{self.team_id}:{version}:{self.digest}"
+
+    def get(self):
+        if self.cache is None:
+            return None
+        self.key = self._key(_get_roster_version(self.cache, self.team_id))
+        return self.cache.get(self.key)
+
+    def set(self, value):
+        if self.cache is not None:
+            self.cache.set(self.key, value, settings.TEAM_ROSTER_CACHE_TIMEOUT)
+
+    async def aget(self):
+        if self.cache is None:
+            return None
+        self.key = self._key(await _aget_roster_version(self.cache, self.team_id))
+        return await self.cache.aget(self.key)
+
+    async def aset(self, value):
+        if self.cache is not None:
+            await self.cache.aset(self.key, value, settings.TEAM_ROSTER_CACHE_TIMEOUT)
@@ -0,0 +1,108 @@
+"""
+Member search over TeamMemberSearch documents, where every term of the query must
+match. On SQLite terms match word prefixes through an FTS5 index (eg. "lov" finds
+"Lovelace", "example" finds "ada@example.com"). On PostgreSQL they match any
+substring, through a pg_trgm GIN index serving the LIKE lookups.
+"""
+
+import phonenumbers
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+from .models import TeamMember, TeamMemberSearch
+from .roster_cache import bump_roster_versions
+
+FTS_TABLE = "teams_teammembersearch_fts"
+# Largest value of the 64 bit primary keys
+MAX_ROLE_ID = 2**63 - 1
+
+
+def build_search_document(user):
+    terms = [user.first_name, user.last_name, user.email]
+    if user.phone_number:
+        # The national number too, so numbers can be found as dialed locally
+        try:
+            national_number = phonenumbers.parse(user.phone_number).national_number
+            terms += [user.phone_number, str(national_number)]
+        except phonenumbers.NumberParseException:
+            terms.append(user.phone_number)
+    return " ".join(filter(None, terms)).lower()
+
+
+def index_member(member):
+    TeamMemberSearch.objects.update_or_create(
+        member=member, defaults={"document": build_search_document(member.user)}
+    )
+
+
+def index_user_memberships(user):
+    TeamMemberSearch.objects.filter(member__user=user).update(
+        document=build_search_document(user)
+    )
+
+
+def rebuild_search_index(batch_size):
+    """Indexes members created without signals (eg. bulk_create). Returns the count."""
+    indexed = 0
+    team_ids = set()
+    members = (
+        TeamMember.objects.filter(search__isnull=True)
+        .select_related("user")
+        .iterator(chunk_size=batch_size)
+    )
+    batch = []
+    for member in members:
+        team_ids.add(member.team_id)
+        batch.append(
+            TeamMemberSearch(member=member, document=build_search_document(member.user))
+        )
+        if len(batch) == batch_size:
+            indexed += len(TeamMemberSearch.objects.bulk_create(batch))
+            batch = []
+    indexed += len(TeamMemberSearch.objects.bulk_create(batch))
+    # Cached searches of these teams missed the members. Only reaches the server's
+    # pages when the roster cache is shared, not with the per process locmem one
+    bump_roster_versions(*team_ids)
+    return indexed
+
+
+def search_members(queryset, query):
+    """Filters the members to the ones matching every term of the query."""
+    terms = query.lower().split()
+    if not terms:
+        return queryset
+    if connection.vendor == "sqlite":
+        # Quoted as FTS5 strings (split on punctuation like the documents), and
+        # matched as prefixes
+        expression = " AND ".join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms
+        )
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [expression],
+            )
+        )
+    for term in terms:
+        queryset = queryset.filter(search__document__contains=term)
+    return queryset
+
+
+def filter_members(queryset, params):
+    """Applies the ?search= and ?role= (id or name) filters of the member list."""
+    search = params.get("search")
+    if search:
+        queryset = search_members(queryset, search)
+    role = params.get("role")
+    if role:
+        if not role.isdigit():
+            return queryset.filter(role__name=role)
+        # isdigit() also holds for digits int() rejects (eg. "²")
+        try:
+            role_id = int(role)
+        except ValueError:
+            raise ValidationError({"role": "Enter a valid role id or name."})
+        if role_id > MAX_ROLE_ID:
+            raise ValidationError({"role": "Enter a valid role id or name."})
+        queryset = queryset.filter(role_id=role_id)
+    return queryset
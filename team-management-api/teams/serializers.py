@@ -1,6 +1,12 @@
 from rest_framework import serializers
 from .models import Team, TeamMember, TeamRole, TeamInvitation
+from .roles import role_registry
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from utils.validators.phone_number_validator import (
+    PhoneNumberValidator,
+    normalize_phone_number,
+)
 
 User = get_user_model()
 
@@ -24,12 +30,27 @@ class TeamMemberUserSerializer(serializers.ModelSerializer):
 
 class TeamMemberSerializer(serializers.ModelSerializer):
     user = TeamMemberUserSerializer()
-    role = TeamRoleSerializer()
+    role = serializers.SerializerMethodField()
 
     class Meta:
         model = TeamMember
         fields = ["id", "user", "role"]
 
+    def get_role(self, obj):
+        # Served by the role registry rather than joined, and serialized once per
+        # role rather than per member
+        serialized_roles = self.context.setdefault("serialized_roles", {})
+        if obj.role_id not in serialized_roles:
+            # Async views pass the catalog, as the registry may load it synchronously
+            roles = self.context.get("roles")
+            role = (
+                roles[obj.role_id]
+                if roles is not None
+                else role_registry.get(obj.role_id)
+            )
+            serialized_roles[obj.role_id] = TeamRoleSerializer(role).data
+        return serialized_roles[obj.role_id]
+
 
 class TeamSerializer(serializers.ModelSerializer):
     members = serializers.SerializerMethodField()
@@ -37,12 +58,27 @@ class TeamSerializer(serializers.ModelSerializer):
     class Meta:
         model = Team
         fields = "__all__"
+        read_only_fields = ["member_count", "manager_count"]
 
     def get_members(self, obj):
-        members = TeamMember.objects.filter(team=obj)
+        # Uses the teammember_set prefetched by TeamViewSet when available
+        members = obj.teammember_set.all()
         return TeamMemberSerializer(members, many=True).data
 
 
+class TeamSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Team
+        fields = [
+            "id",
+            "name",
+            "description",
+            "member_count",
+            "created_at",
+            "updated_at",
+        ]
+
+
 class TeamMinimalSerializer(serializers.ModelSerializer):
     class Meta:
         model = Team
@@ -67,6 +103,9 @@ class TeamInvitationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "status", "created_at", "updated_at", "expires_at"]
 
+    def validate_phone_number(self, value):
+        return normalize_phone_number(value)
+
     def validate(self, data):
         team = data["team"]
         email = data["email"]
@@ -81,6 +120,38 @@ class TeamInvitationSerializer(serializers.ModelSerializer):
         return data
 
 
+class TeamInvitationBulkItemSerializer(serializers.Serializer):
+    """A single invitee of a bulk invitation. Team level conflicts are checked by the view."""
+
+    # TeamInvitation.email's length, which bulk_create doesn't validate
+    email = serializers.EmailField(max_length=254)
+    first_name = serializers.CharField(max_length=255)
+    last_name = serializers.CharField(max_length=255)
+    phone_number = serializers.CharField(
+        max_length=255, validators=[PhoneNumberValidator()]
+    )
+    role = serializers.IntegerField()
+
+    def validate_phone_number(self, value):
+        return normalize_phone_number(value)
+
+    def validate_role(self, value):
+        # Roles are preloaded by the view, to avoid a query per invitee
+        role = self.context["roles"].get(value)
+        if role is None:
+            raise serializers.ValidationError("Invalid role.")
+        return role
+
+
+class TeamInvitationBulkCreateSerializer(serializers.Serializer):
+    team = serializers.PrimaryKeyRelatedField(queryset=Team.objects.all())
+    invitations = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.TEAM_INVITATIONS_BULK_MAX_SIZE,
+    )
+
+
 class TeamInvitationDetailSerializer(TeamInvitationSerializer):
     user_exists = serializers.SerializerMethodField()
     team = TeamMinimalSerializer(read_only=True)
@@ -89,6 +160,9 @@ class TeamInvitationDetailSerializer(TeamInvitationSerializer):
         fields = TeamInvitationSerializer.Meta.fields + ["user_exists", "team"]
 
     def get_user_exists(self, obj):
+        # Precomputed by the async view, which can't query from here
+        if "user_exists" in self.context:
+            return self.context["user_exists"]
         return User.objects.filter(email=obj.email).exists()
 
 
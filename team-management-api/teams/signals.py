@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .models import Team, TeamMember, TeamRole
+from .permissions import invalidate_user_team_permissions
+from .roles import role_registry
+from .roster_cache import bump_roster_versions
+from .search import index_member, index_user_memberships
+
+
+@receiver([post_save, post_delete], sender=TeamMember)
+def invalidate_member_permissions(sender, instance, **kwargs):
+    invalidate_user_team_permissions(instance.user_id)
+
+
+@receiver(post_save, sender=TeamMember)
+def index_new_member(sender, instance, created, **kwargs):
+    # The document only holds user fields, updated by reindex_user_memberships
+    if created:
+        index_member(instance)
+
+
+@receiver([post_save, post_delete], sender=TeamMember)
+def bump_member_roster(sender, instance, **kwargs):
+    bump_roster_versions(instance.team_id)
+
+
+@receiver(post_init, sender=TeamMember)
+def remember_member_role(sender, instance, **kwargs):
+    # Deferred role_ids are missing, so the next save recounts
+    instance._counted_role_id = instance.__dict__.get("role_id")
+
+
+@receiver(post_save, sender=TeamMember)
+def count_saved_member(sender, instance, created, **kwargs):
+    if created:
+        Team.objects.count_member(instance.team_id, instance.role_id, 1)
+    elif instance.role_id != instance._counted_role_id:
+        # Recounted rather than adjusted by a delta, which concurrent updates of
+        # the same member would both apply
+        Team.objects.recount([instance.team_id], "manager_count")
+    instance._counted_role_id = instance.role_id
+
+
+@receiver(post_delete, sender=TeamMember)
+def count_deleted_member(sender, instance, **kwargs):
+    Team.objects.count_member(instance.team_id, instance.role_id, -1)
+
+
+@receiver(post_save, sender=TeamRole)
+def recount_role_managers(sender, instance, created, update_fields=None, **kwargs):
+    # Granting or revoking member management changes the manager counts
+    if created or (update_fields is not None and "permissions" not in update_fields):
+        return
+    Team.objects.recount(
+        TeamMember.objects.filter(role=instance).values("team_id").distinct(),
+        "manager_count",
+    )
+
+
+@receiver(post_save, sender=TeamRole)
+def bump_role_rosters(sender, instance, created, **kwargs):
+    # Deleted roles take their members along, which bumps their rosters
+    if created:
+        return
+    team_ids = TeamMember.objects.filter(role=instance).values_list(
+        "team_id", flat=True
+    )
+    bump_roster_versions(*set(team_ids))
+
+
+@receiver([post_save, post_delete], sender=TeamRole)
+def invalidate_role_registry(sender, instance, **kwargs):
+    role_registry.invalidate()
+
+
+@receiver([post_save, post_delete], sender=TeamRole)
+def invalidate_role_permissions(sender, instance, **kwargs):
+    user_ids = TeamMember.objects.filter(role=instance).values_list(
+        "user_id", flat=True
+    )
+    invalidate_user_team_permissions(*set(user_ids))
+
+
+@receiver(post_save, sender=get_user_model())
+def bump_user_rosters(sender, instance, created, update_fields=None, **kwargs):
+    # Rosters embed the members' profile
+    if created or update_fields == frozenset(["last_login"]):
+        return
+    team_ids = TeamMember.objects.filter(user=instance).values_list(
+        "team_id", flat=True
+    )
+    bump_roster_versions(*team_ids)
+
+
+@receiver(post_save, sender=get_user_model())
+def reindex_user_memberships(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields == frozenset(["last_login"]):
+        return
+    index_user_memberships(instance)
@@ -1,3 +1,1152 @@
-from django.test import TestCase
+import base64
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from emails.models import OutboxEmail
+from users.serializers import CustomTokenObtainPairSerializer
+from .async_views import (
+    MyTeamPermissionsAsyncView,
+    TeamInvitationDetailAsyncView,
+    TeamMemberListAsyncView,
+)
+from .emails import (
+    INVITATION_EXPIRY_DAYS,
+    INVITATION_SUBJECT,
+    render_invitation_email,
+    render_invitation_emails,
+)
+from .models import Team, TeamInvitation, TeamMember, TeamRole
+from .permissions import get_user_team_permissions, user_has_team_permission
+from .roles import RoleRegistry, role_registry
+from .views import TeamMemberViewSet
 
-# Create your tests here.
+User = get_user_model()
+
+ADMIN_PERMISSIONS = [
+    "team:view",
+    "team:update",
+    "team:delete",
+    "members:view",
+    "members:add",
+    "members:update",
+    "members:remove",
+    "members:leave",
+]
+REGULAR_PERMISSIONS = ["team:view", "members:view", "members:leave"]
+
+
+class TeamTestMixin:
+    def setUp(self):
+        super().setUp()
+        for backend in caches.all():
+            backend.clear()
+        self.admin_role = TeamRole.objects.create(
+            name="Admin", description="Admin", permissions=ADMIN_PERMISSIONS
+        )
+        self.regular_role = TeamRole.objects.create(
+            name="Regular", description="Regular", permissions=REGULAR_PERMISSIONS
+        )
+        # Loaded once per process, not by each request
+        role_registry.roles()
+
+    def create_user(self, email, **extra_fields):
+        return User.objects.create_user(email=email, **extra_fields)
+
+    def create_team(self, name="Team", admin=None):
+        team = Team.objects.create(name=name, description=f"{name} description")
+        if admin is not None:
+            TeamMember.objects.create(team=team, user=admin, role=self.admin_role)
+        return team
+
+
+class TeamPermissionResolutionTests(TeamTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("admin@example.com")
+        self.team = self.create_team("Alpha", admin=self.user)
+        self.other_team = self.create_team("Beta")
+
+    def test_permissions_are_loaded_once_per_user_instance(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                user_has_team_permission(self.user, self.team, "members:remove")
+            )
+            self.assertTrue(
+                user_has_team_permission(self.user, self.team.pk, "team:view")
+            )
+            self.assertFalse(
+                user_has_team_permission(self.user, self.other_team, "team:view")
+            )
+
+    @override_settings(TEAM_PERMISSIONS_CACHE="default")
+    def test_permissions_are_shared_across_requests_through_cache(self):
+        get_user_team_permissions(self.user)
+        fresh_user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                user_has_team_permission(fresh_user, self.team, "team:view")
+            )
+
+    def test_membership_change_invalidates_permissions(self):
+        self.assertTrue(
+            user_has_team_permission(self.user, self.team, "members:remove")
+        )
+        member = TeamMember.objects.get(team=self.team, user=self.user)
+        member.role = self.regular_role
+        member.save()
+        self.assertFalse(
+            user_has_team_permission(self.user, self.team, "members:remove")
+        )
+        TeamMember.objects.create(
+            team=self.other_team, user=self.user, role=self.regular_role
+        )
+        self.assertTrue(
+            user_has_team_permission(self.user, self.other_team, "team:view")
+        )
+
+    def test_role_change_invalidates_permissions(self):
+        self.assertTrue(
+            user_has_team_permission(self.user, self.team, "members:remove")
+        )
+        self.admin_role.permissions = REGULAR_PERMISSIONS
+        self.admin_role.save()
+        fresh_user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(
+            user_has_team_permission(fresh_user, self.team, "members:remove")
+        )
+
+    def test_user_can_only_be_a_member_of_a_team_once(self):
+        with self.assertRaises(IntegrityError):
+            TeamMember.objects.create(
+                team=self.team, user=self.user, role=self.regular_role
+            )
+
+
+class TeamRolePermissionMaskTests(TeamTestMixin, TestCase):
+    def test_mask_is_compiled_on_save(self):
+        self.assertTrue(self.admin_role.can_manage_members())
+        self.assertFalse(self.regular_role.can_manage_members())
+        self.regular_role.permissions = [*REGULAR_PERMISSIONS, "members:add"]
+        self.regular_role.save(update_fields=["permissions"])
+        self.regular_role.refresh_from_db()
+        self.assertTrue(self.regular_role.has_permission("members:add"))
+        self.assertEqual(
+            list(TeamRole.objects.with_permissions("members:add", "members:view")),
+            [self.admin_role, self.regular_role],
+        )
+
+    def test_unknown_permissions_are_rejected(self):
+        with self.assertRaises(ValueError):
+            TeamRole.objects.create(name="Broken", permissions=["team:explode"])
+
+    def test_last_admin_counts_managers_across_roles(self):
+        owner_role = TeamRole.objects.create(
+            name="Owner", description="Owner", permissions=ADMIN_PERMISSIONS
+        )
+        team = self.create_team("Alpha", admin=self.create_user("admin@example.com"))
+        admin = TeamMember.objects.get(team=team)
+        self.assertTrue(TeamMember.objects.is_last_admin(admin))
+
+        TeamMember.objects.create(
+            team=team, user=self.create_user("owner@example.com"), role=owner_role
+        )
+        regular = TeamMember.objects.create(
+            team=team,
+            user=self.create_user("regular@example.com"),
+            role=self.regular_role,
+        )
+        self.assertFalse(TeamMember.objects.is_last_admin(admin))
+        self.assertFalse(TeamMember.objects.is_last_admin(regular))
+        self.assertEqual(TeamMember.objects.managers(team).count(), 2)
+
+
+class RoleRegistryTests(TeamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("admin@example.com")
+        self.client.force_authenticate(self.user)
+
+    def test_roles_are_served_without_queries(self):
+        role_registry.roles()
+        with self.assertNumQueries(0):
+            self.assertEqual(role_registry.get_by_name("Admin"), self.admin_role)
+            self.assertEqual(role_registry.get(self.regular_role.pk).name, "Regular")
+            response = self.client.get("/api/team-roles/")
+        self.assertEqual([role["name"] for role in response.data], ["Admin", "Regular"])
+        response = self.client.get("/api/team-roles/0/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_registry_is_invalidated_on_role_changes(self):
+        role_registry.roles()
+        self.regular_role.name = "Member"
+        self.regular_role.save()
+        self.assertEqual(role_registry.get(self.regular_role.pk).name, "Member")
+        self.regular_role.delete()
+        with self.assertRaises(TeamRole.DoesNotExist):
+            role_registry.get_by_name("Member")
+
+    @override_settings(TEAM_ROLES_CACHE="default")
+    def test_invalidations_reach_other_processes_through_the_shared_cache(self):
+        other_process = RoleRegistry()
+        self.assertEqual(other_process.get(self.admin_role.pk).name, "Admin")
+        self.admin_role.name = "Owner"
+        self.admin_role.save()
+        self.assertEqual(other_process.get(self.admin_role.pk).name, "Owner")
+
+        with override_settings(TEAM_ROLES_CACHE=""):
+            other_process = RoleRegistry()
+            other_process.roles()
+            self.admin_role.name = "Admin"
+            self.admin_role.save()
+            self.assertEqual(other_process.get(self.admin_role.pk).name, "Owner")
+
+    def test_catalog_is_reloaded_periodically_without_a_shared_cache(self):
+        other_process = RoleRegistry()
+        other_process.roles()
+        self.admin_role.name = "Owner"
+        self.admin_role.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(other_process.get(self.admin_role.pk).name, "Admin")
+        with override_settings(TEAM_ROLES_RELOAD_INTERVAL=0):
+            self.assertEqual(other_process.get(self.admin_role.pk).name, "Owner")
+
+    @override_settings(TEAM_ROLES_CACHE="default")
+    def test_catalogs_loaded_before_the_commit_are_invalidated(self):
+        other_process = RoleRegistry()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin_role.name = "Owner"
+            self.admin_role.save()
+            # Stands for a concurrent read of the catalog before the commit
+            TeamRole.objects.filter(pk=self.admin_role.pk).update(name="Admin")
+            self.assertEqual(other_process.get(self.admin_role.pk).name, "Admin")
+            TeamRole.objects.filter(pk=self.admin_role.pk).update(name="Owner")
+        self.assertEqual(other_process.get(self.admin_role.pk).name, "Owner")
+
+
+class TeamViewSetTests(TeamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("admin@example.com")
+        self.team = self.create_team("Alpha", admin=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_retrieve_requires_team_membership(self):
+        outsider = self.create_user("outsider@example.com")
+        response = self.client.get(f"/api/teams/{self.team.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f"/api/teams/{self.team.pk}/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_returns_summaries_in_a_single_query(self):
+        for index in range(3):
+            team = self.create_team(f"Team {index}", admin=self.user)
+            for member_index in range(index):
+                member = self.create_user(f"member{index}-{member_index}@example.com")
+                TeamMember.objects.create(
+                    team=team, user=member, role=self.regular_role
+                )
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/teams/")
+        results = response.data["results"]
+        self.assertEqual([team["member_count"] for team in results], [1, 1, 2, 3])
+        self.assertNotIn("members", results[0])
+
+    def test_retrieve_query_count_does_not_grow_with_members(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/api/teams/{self.team.pk}/")
+        self.assertEqual(len(response.data["members"]), 1)
+
+        for index in range(5):
+            member = self.create_user(f"member{index}@example.com")
+            TeamMember.objects.create(
+                team=self.team, user=member, role=self.regular_role
+            )
+
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/api/teams/{self.team.pk}/")
+        self.assertEqual(len(response.data["members"]), 6)
+
+    def test_retrieve_is_not_modified_until_the_roster_changes(self):
+        url = f"/api/teams/{self.team.pk}/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.admin_role.description = "Changed"
+        self.admin_role.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.user.first_name = "Ada"
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class TeamMemberViewSetTests(TeamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("admin@example.com")
+        self.team = self.create_team("Alpha", admin=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_list_is_cursor_paginated(self):
+        for index in range(4):
+            member = self.create_user(f"member{index}@example.com")
+            TeamMember.objects.create(
+                team=self.team, user=member, role=self.regular_role
+            )
+
+        url = f"/api/teams/{self.team.pk}/members/?page_size=2"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            seen += [member["id"] for member in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(
+            seen,
+            list(
+                TeamMember.objects.filter(team=self.team)
+                .order_by("created_at", "id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+    def test_list_requires_members_view_permission(self):
+        outsider = self.create_user("outsider@example.com")
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f"/api/teams/{self.team.pk}/members/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_is_not_modified_until_a_member_changes(self):
+        url = f"/api/teams/{self.team.pk}/members/"
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        member = self.create_user("member@example.com")
+        TeamMember.objects.create(team=self.team, user=member, role=self.regular_role)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertNotIn("Last-Modified", response)
+
+    @override_settings(TEAM_ROSTER_CACHE="")
+    def test_list_is_modified_by_profile_changes(self):
+        url = f"/api/teams/{self.team.pk}/members/"
+        etag = self.client.get(url)["ETag"]
+        member_updated_at = TeamMember.objects.get(user=self.user).updated_at
+
+        self.user.first_name = "Ada"
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["user"]["full_name"], "Ada")
+        # Memberships aren't rewritten on profile changes
+        self.assertEqual(
+            TeamMember.objects.get(user=self.user).updated_at, member_updated_at
+        )
+
+    @override_settings(TEAM_ROSTER_CACHE="rosters")
+    def test_list_pages_are_cached_until_the_roster_changes(self):
+        url = f"/api/teams/{self.team.pk}/members/"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["user"]["full_name"], "")
+
+        member = self.create_user("member@example.com")
+        invitation = TeamInvitation.objects.create(
+            team=self.team,
+            email=member.email,
+            role=self.regular_role,
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+        self.client.force_authenticate(member)
+        self.client.post(f"/api/team-invitations/{invitation.pk}/accept/")
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        self.user.first_name = "Ada"
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["user"]["full_name"], "Ada")
+
+        joined = response.data["results"][1]["id"]
+        self.client.patch(f"{url}{joined}/", {"role": self.admin_role.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"][1]["role"]["name"], "Admin")
+
+        self.client.delete(f"{url}{joined}/")
+        response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_my_permissions_are_not_modified_until_the_role_changes(self):
+        url = f"/api/teams/{self.team.pk}/permissions/"
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        member = TeamMember.objects.get(team=self.team, user=self.user)
+        member.role = self.regular_role
+        member.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["role"], "Regular")
+
+    def test_destroy_refuses_to_remove_the_last_admin(self):
+        other_admin = self.create_user("other@example.com")
+        other_member = TeamMember.objects.create(
+            team=self.team, user=other_admin, role=self.admin_role
+        )
+        member = TeamMember.objects.get(team=self.team, user=self.user)
+
+        response = self.client.delete(
+            f"/api/teams/{self.team.pk}/members/{other_member.pk}/"
+        )
+        self.assertEqual(response.status_code, 204)
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        response = self.client.delete(f"/api/teams/{self.team.pk}/members/{member.pk}/")
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(TeamMember.objects.filter(pk=member.pk).exists())
+
+    def test_destroy_fetches_the_member_once(self):
+        regular = TeamMember.objects.create(
+            team=self.team,
+            user=self.create_user("regular@example.com"),
+            role=self.regular_role,
+        )
+        # Permissions, member, locked manager count, delete of the member and its
+        # search document, and the team counters (savepoint and release)
+        with self.assertNumQueries(8):
+            response = self.client.delete(
+                f"/api/teams/{self.team.pk}/members/{regular.pk}/"
+            )
+        self.assertEqual(response.status_code, 204)
+
+
+class TeamCountersTests(TeamTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.team = self.create_team("Alpha", admin=self.create_user("a@example.com"))
+
+    def assertCounters(self, member_count, manager_count):
+        self.team.refresh_from_db()
+        self.assertEqual(
+            (self.team.member_count, self.team.manager_count),
+            (member_count, manager_count),
+        )
+
+    def test_counters_follow_member_changes(self):
+        self.assertCounters(1, 1)
+        member = TeamMember.objects.create(
+            team=self.team,
+            user=self.create_user("b@example.com"),
+            role=self.regular_role,
+        )
+        self.assertCounters(2, 1)
+
+        member.role = self.admin_role
+        member.save()
+        self.assertCounters(2, 2)
+        self.assertFalse(TeamMember.objects.is_last_admin(member))
+
+        member = TeamMember.objects.get(pk=member.pk)
+        member.role = self.regular_role
+        member.save()
+        self.assertCounters(2, 1)
+
+        member.delete()
+        self.assertCounters(1, 1)
+
+    def test_concurrent_role_changes_do_not_drift(self):
+        member = TeamMember.objects.create(
+            team=self.team,
+            user=self.create_user("b@example.com"),
+            role=self.regular_role,
+        )
+        # Two requests promoting the same member from their own copies
+        copies = [TeamMember.objects.get(pk=member.pk) for _ in range(2)]
+        for copy in copies:
+            copy.role = self.admin_role
+            copy.save()
+        self.assertCounters(2, 2)
+
+    def test_last_admin_check_reads_the_counters(self):
+        admin = TeamMember.objects.get(team=self.team)
+        self.assertFalse(TeamMember.objects.remove_member(admin))
+
+        # Drifted counters are trusted until reconciled
+        Team.objects.filter(pk=self.team.pk).update(manager_count=2)
+        with self.assertNumQueries(1):
+            self.assertFalse(TeamMember.objects.is_last_admin(admin))
+        call_command("reconcile_team_counters", stdout=StringIO())
+        self.assertTrue(TeamMember.objects.is_last_admin(admin))
+        self.assertTrue(TeamMember.objects.filter(pk=admin.pk).exists())
+
+    def test_role_changes_only_recount_managers(self):
+        member = TeamMember.objects.create(
+            team=self.team,
+            user=self.create_user("b@example.com"),
+            role=self.regular_role,
+        )
+        Team.objects.filter(pk=self.team.pk).update(member_count=5)
+        member.save()
+        self.assertCounters(5, 1)
+
+        member.role = self.admin_role
+        member.save()
+        self.assertCounters(5, 2)
+
+    def test_deletes_succeed_with_undercounted_teams(self):
+        TeamMember.objects.bulk_create(
+            [
+                TeamMember(
+                    team=self.team,
+                    user=self.create_user("b@example.com"),
+                    role=self.admin_role,
+                )
+            ]
+        )
+        Team.objects.filter(pk=self.team.pk).update(member_count=0, manager_count=0)
+        TeamMember.objects.filter(team=self.team).first().delete()
+        self.assertCounters(0, 0)
+        self.team.delete()
+
+    def test_role_permission_changes_recount_managers(self):
+        self.regular_role.permissions = ADMIN_PERMISSIONS
+        TeamMember.objects.create(
+            team=self.team,
+            user=self.create_user("b@example.com"),
+            role=self.regular_role,
+        )
+        self.assertCounters(2, 1)
+        self.regular_role.save()
+        self.assertCounters(2, 2)
+
+    def test_reconcile_repairs_drifted_counters(self):
+        other = self.create_team("Beta", admin=self.create_user("b@example.com"))
+        TeamMember.objects.bulk_create(
+            [
+                TeamMember(
+                    team=self.team,
+                    user=self.create_user(f"user{index}@example.com"),
+                    role=self.regular_role,
+                )
+                for index in range(3)
+            ]
+        )
+        Team.objects.filter(pk=other.pk).update(manager_count=5)
+
+        stdout = StringIO()
+        call_command("reconcile_team_counters", batch_size=1, stdout=stdout)
+        self.assertIn("Fixed the counters of 2 teams.", stdout.getvalue())
+        self.assertCounters(4, 1)
+        other.refresh_from_db()
+        self.assertEqual((other.member_count, other.manager_count), (1, 1))
+
+
+class TeamMemberSearchTests(TeamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(
+            "ada@example.com", first_name="Ada", last_name="Lovelace"
+        )
+        self.team = self.create_team("Alpha", admin=self.user)
+        for first_name, last_name, phone_number in [
+            ("Grace", "Hopper", "+14155552671"),
+            ("Alan", "Turing", ""),
+        ]:
+            member = self.create_user(
+                f"{first_name.lower()}@example.org",
+                first_name=first_name,
+                last_name=last_name,
+                phone_number=phone_number,
+            )
+            TeamMember.objects.create(
+                team=self.team, user=member, role=self.regular_role
+            )
+        other_team = self.create_team("Beta")
+        TeamMember.objects.create(
+            team=other_team,
+            user=self.create_user("grace@example.net", first_name="Grace"),
+            role=self.regular_role,
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        response = self.client.get(f"/api/teams/{self.team.pk}/members/", params)
+        self.assertEqual(response.status_code, 200)
+        return [member["user"]["email"] for member in response.data["results"]]
+
+    def test_search_matches_names_emails_and_phones(self):
+        self.assertEqual(self.search(search="grace"), ["grace@example.org"])
+        self.assertEqual(self.search(search="LOVE"), ["ada@example.com"])
+        self.assertEqual(
+            self.search(search="example.org"), ["grace@example.org", "alan@example.org"]
+        )
+        self.assertEqual(self.search(search="415555"), ["grace@example.org"])
+        self.assertEqual(self.search(search="+1415"), ["grace@example.org"])
+        self.assertEqual(self.search(search="al tur"), ["alan@example.org"])
+        self.assertEqual(self.search(search="nobody"), [])
+
+    def test_filter_by_role(self):
+        self.assertEqual(self.search(role="Admin"), ["ada@example.com"])
+        self.assertEqual(
+            self.search(role=str(self.regular_role.pk), search="example.org"),
+            ["grace@example.org", "alan@example.org"],
+        )
+
+    def test_invalid_role_ids_are_rejected(self):
+        url = f"/api/teams/{self.team.pk}/members/"
+        for role in ["\u00b2", "9" * 20]:
+            response = self.client.get(url, {"role": role})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("role", response.data)
+
+    def test_index_follows_user_changes(self):
+        self.user.last_name = "Byron"
+        self.user.save()
+        self.assertEqual(self.search(search="byron"), ["ada@example.com"])
+        self.assertEqual(self.search(search="lovelace"), [])
+
+    def test_rebuild_indexes_bulk_created_members(self):
+        user = self.create_user("bulk@example.com", first_name="Bulk")
+        TeamMember.objects.bulk_create(
+            [TeamMember(team=self.team, user=user, role=self.regular_role)]
+        )
+        self.assertEqual(self.search(search="bulk"), [])
+        call_command("rebuild_member_search_index", stdout=StringIO())
+        self.assertEqual(self.search(search="bulk"), ["bulk@example.com"])
+
+
+class TeamRosterImportExportTests(TeamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(
+            "admin@example.com", first_name="Ada", phone_number="+14155552671"
+        )
+        self.team = self.create_team("Alpha", admin=self.user)
+        self.client.force_authenticate(self.user)
+
+    def export(self, file_format):
+        response = self.client.get(
+            f"/api/teams/{self.team.pk}/members/export/?file_format={file_format}"
+        )
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_streams_csv_and_jsonl(self):
+        lines = self.export("csv").splitlines()
+        self.assertEqual(
+            lines[0], "email,first_name,last_name,phone_number,role,joined_at"
+        )
+        self.assertTrue(
+            lines[1].startswith("admin@example.com,Ada,,'+14155552671,Admin,")
+        )
+
+        rows = [json.loads(line) for line in self.export("jsonl").splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["role"], "Admin")
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.async_client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]] = str(
+            token
+        )
+        response = await self.async_client.get(
+            f"/api/teams/{self.team.pk}/members/export/?file_format=csv"
+        )
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b"admin@example.com,Ada", content)
+
+    def test_export_rejects_unknown_formats(self):
+        response = self.client.get(
+            f"/api/teams/{self.team.pk}/members/export/?file_format=xlsx"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(TEAM_ROSTER_IMPORT_BATCH_SIZE=2)
+    def test_import_invites_rows_in_batches(self):
+        roster = (
+            "email,first_name,last_name,phone_number,role\n"
+            "one@example.com,One,Member,+14155552671,Regular\n"
+            "admin@example.com,Ada,,+14155552671,Admin\n"
+            f"two@example.com,Two,Member,+14155552671,{self.regular_role.pk}\n"
+            "one@example.com,One,Again,+14155552671,Regular\n"
+            "three@example.com,Three,Member,123,Regular\n"
+        )
+        response = self.client.post(
+            f"/api/teams/{self.team.pk}/members/import/?file_format=csv",
+            {"file": SimpleUploadedFile("roster.csv", roster.encode())},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "error", "created", "error", "error"],
+        )
+        self.assertEqual(
+            sorted(TeamInvitation.objects.values_list("email", flat=True)),
+            ["one@example.com", "two@example.com"],
+        )
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_csv_export_escapes_formulas(self):
+        self.user.first_name = "=HYPERLINK(0)"
+        self.user.last_name = "@SUM(1)"
+        self.user.save()
+        rows = list(csv.reader(self.export("csv").splitlines()))
+        self.assertEqual(
+            rows[1][:4],
+            ["admin@example.com", "'=HYPERLINK(0)", "'@SUM(1)", "'+14155552671"],
+        )
+
+        rows = [json.loads(line) for line in self.export("jsonl").splitlines()]
+        self.assertEqual(rows[0]["first_name"], "=HYPERLINK(0)")
+
+    def test_exported_csv_can_be_imported_back(self):
+        other_team = self.create_team("Beta", admin=self.user)
+        self.user.last_name = "Lovelace"
+        self.user.save()
+        roster = self.export("csv").replace("admin@example.com", "one@example.com")
+        response = self.client.post(
+            f"/api/teams/{other_team.pk}/members/import/?file_format=csv",
+            {"file": SimpleUploadedFile("roster.csv", roster.encode())},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        invitation = TeamInvitation.objects.get(team=other_team)
+        self.assertEqual(invitation.phone_number, "+14155552671")
+
+    def test_import_reports_malformed_jsonl(self):
+        roster = b'{"email": "one@example.com"}\nnot json\n'
+        response = self.client.post(
+            f"/api/teams/{self.team.pk}/members/import/?file_format=jsonl",
+            {"file": SimpleUploadedFile("roster.jsonl", roster)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 2", response.data["detail"])
+
+    def test_import_requires_members_add_permission(self):
+        regular = self.create_user("regular@example.com")
+        TeamMember.objects.create(team=self.team, user=regular, role=self.regular_role)
+        self.client.force_authenticate(regular)
+        response = self.client.post(
+            f"/api/teams/{self.team.pk}/members/import/",
+            {"file": SimpleUploadedFile("roster.csv", b"email\n")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class AsyncReadViewsTests(TeamTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("admin@example.com", first_name="Ada")
+        self.team = self.create_team("Alpha", admin=self.user)
+        self.factory = AsyncRequestFactory()
+
+    def get(self, view, user=None, headers=None, **kwargs):
+        request = self.factory.get("/", headers=headers)
+        if user is not None:
+            token = CustomTokenObtainPairSerializer.get_token(user).access_token
+            request.COOKIES[settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]] = str(token)
+        return view.as_view()(request, **kwargs)
+
+    async def test_my_permissions(self):
+        response = await self.get(
+            MyTeamPermissionsAsyncView, self.user, team_id=self.team.pk
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["role"], "Admin")
+
+        response = await self.get(
+            MyTeamPermissionsAsyncView,
+            self.user,
+            headers={"If-None-Match": response["ETag"]},
+            team_id=self.team.pk,
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_authentication_is_required(self):
+        response = await self.get(MyTeamPermissionsAsyncView, team_id=self.team.pk)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_member_list_requires_members_view_permission(self):
+        response = await self.get(
+            TeamMemberListAsyncView, self.user, team_pk=self.team.pk
+        )
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)["results"]
+        self.assertEqual(
+            [member["user"]["email"] for member in results], [self.user.email]
+        )
+
+        outsider = await User.objects.acreate(email="outsider@example.com")
+        response = await self.get(
+            TeamMemberListAsyncView, outsider, team_pk=self.team.pk
+        )
+        self.assertEqual(response.status_code, 403)
+
+    async def test_member_list_is_cursor_paginated(self):
+        for index in range(2):
+            member = await User.objects.acreate(email=f"member{index}@example.com")
+            await TeamMember.objects.acreate(
+                team=self.team, user=member, role=self.regular_role
+            )
+        members = []
+        url = "/?page_size=2"
+        while url:
+            request = self.factory.get(url)
+            request._force_auth_user = self.user
+            response = await TeamMemberListAsyncView.as_view()(
+                request, team_pk=self.team.pk
+            )
+            data = json.loads(response.content)
+            members += [
+                (member["user"]["email"], member["role"]["name"])
+                for member in data["results"]
+            ]
+            url = data["next"]
+        self.assertEqual(
+            members,
+            [
+                (self.user.email, "Admin"),
+                ("member0@example.com", "Regular"),
+                ("member1@example.com", "Regular"),
+            ],
+        )
+
+    async def test_authenticates_like_the_sync_views(self):
+        self.user.set_password("secret")
+        await self.user.asave()
+        credentials = base64.b64encode(b"admin@example.com:secret").decode()
+        request = self.factory.get(
+            "/", headers={"Authorization": f"Basic {credentials}"}
+        )
+        response = await MyTeamPermissionsAsyncView.as_view()(
+            request, team_id=self.team.pk
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # Set by AuthenticationMiddleware for session authenticated requests
+        request = self.factory.get("/")
+        request.user = self.user
+        response = await MyTeamPermissionsAsyncView.as_view()(
+            request, team_id=self.team.pk
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.get(MyTeamPermissionsAsyncView, team_id=self.team.pk)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_member_list_hands_other_methods_to_the_viewset(self):
+        view = TeamMemberListAsyncView.as_view(
+            sync_view=TeamMemberViewSet.as_view({"get": "list", "post": "create"})
+        )
+        request = self.factory.post("/", {}, content_type="application/json")
+        request._force_auth_user = self.user
+        response = await view(request, team_pk=self.team.pk)
+        response.render()
+        self.assertEqual(response.status_code, 405)
+        detail = json.loads(response.content)["detail"]
+        self.assertIn("Invite a team member instead", detail)
+
+    async def test_invitation_detail(self):
+        invitation = await TeamInvitation.objects.acreate(
+            team=self.team,
+            email=self.user.email,
+            first_name="Ada",
+            last_name="Lovelace",
+            phone_number="+14155552671",
+            role=self.regular_role,
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+        response = await self.get(
+            TeamInvitationDetailAsyncView, invitation_id=invitation.pk
+        )
+        data = json.loads(response.content)
+        self.assertTrue(data["user_exists"])
+        self.assertEqual(data["team"]["name"], "Alpha")
+
+        response = await self.get(TeamInvitationDetailAsyncView, invitation_id=0)
+        self.assertEqual(response.status_code, 404)
+
+
+class InvitationEmailTests(TeamTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.inviter = self.create_user(
+            "admin@example.com", first_name="Ada", last_name="Lovelace"
+        )
+        self.invitations = [
+            TeamInvitation.objects.create(
+                team=self.create_team(name),
+                email=f"{name.lower()}@example.com",
+                first_name="Invited",
+                last_name="Member",
+                phone_number="+14155552671",
+                role=self.regular_role,
+                expires_at=timezone.now() + timedelta(days=1),
+            )
+            for name in ["Alpha", "Beta"]
+        ]
+
+    def test_bodies_are_rendered_per_invitation(self):
+        bodies = render_invitation_emails(self.invitations, self.inviter)
+        self.assertEqual(len(bodies), 2)
+        for invitation, (html_body, plain_body) in zip(self.invitations, bodies):
+            for body in [html_body, plain_body]:
+                self.assertIn("Ada Lovelace", body)
+                self.assertIn(invitation.team.name, body)
+                self.assertIn(invitation.get_accept_url(), body)
+                self.assertIn(invitation.get_reject_url(), body)
+                self.assertIn(f"{INVITATION_EXPIRY_DAYS} days", body)
+
+    def test_invitation_context_does_not_leak_between_recipients(self):
+        alpha, beta = self.invitations
+        html_body, plain_body = render_invitation_emails([alpha, beta], self.inviter)[1]
+        for body in [html_body, plain_body]:
+            self.assertNotIn("Alpha", body)
+            self.assertNotIn(alpha.get_accept_url(), body)
+        # Rendered alone or after another invitation, the bodies are the same
+        self.assertEqual(
+            render_invitation_email(beta, self.inviter), (html_body, plain_body)
+        )
+
+    def test_each_invitee_is_sent_their_own_email(self):
+        self.client.force_login(self.inviter)
+        team = self.create_team("Gamma", admin=self.inviter)
+        response = self.client.post(
+            "/api/team-invitations/bulk/",
+            {
+                "team": team.pk,
+                "invitations": [
+                    {
+                        "email": email,
+                        "first_name": "New",
+                        "last_name": "Member",
+                        "phone_number": "+14155552671",
+                        "role": self.regular_role.pk,
+                    }
+                    for email in ["one@example.com", "two@example.com"]
+                ],
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        for invitation in TeamInvitation.objects.filter(team=team):
+            email = OutboxEmail.objects.get(to=[invitation.email])
+            self.assertEqual(email.subject, INVITATION_SUBJECT)
+            self.assertIn(invitation.get_accept_url(), email.plain_body)
+
+
+class TeamInvitationCreateViewTests(TeamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("admin@example.com", first_name="Ada")
+        self.team = self.create_team("Alpha", admin=self.user)
+        self.client.force_authenticate(self.user)
+
+    def test_invitation_email_is_queued(self):
+        response = self.client.post(
+            "/api/team-invitations/",
+            {
+                "team": self.team.pk,
+                "email": "new@example.com",
+                "first_name": "New",
+                "last_name": "Member",
+                "phone_number": "+14155552671",
+                "role": self.regular_role.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        invitation = TeamInvitation.objects.get(email="new@example.com")
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, ["new@example.com"])
+        self.assertIn(invitation.get_accept_url(), email.html_body)
+        self.assertIn("Alpha", email.plain_body)
+
+    def test_bulk_invitations_report_results_per_row(self):
+        member = self.create_user("member@example.com")
+        TeamMember.objects.create(team=self.team, user=member, role=self.regular_role)
+        TeamInvitation.objects.create(
+            team=self.team,
+            email="invited@example.com",
+            first_name="Invited",
+            last_name="Already",
+            phone_number="+14155552671",
+            role=self.regular_role,
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+        def invitee(email, **overrides):
+            return {
+                "email": email,
+                "first_name": "New",
+                "last_name": "Member",
+                "phone_number": "+14155552671",
+                "role": self.regular_role.pk,
+                **overrides,
+            }
+
+        invitees = [
+            invitee("one@example.com"),
+            invitee("member@example.com"),
+            invitee("invited@example.com"),
+            invitee("two@example.com", phone_number="123"),
+            invitee("three@example.com", role=0),
+            invitee("one@example.com"),
+            invitee("four@example.com"),
+            invitee(f"{'a' * 250}@example.com"),
+        ]
+        # Roles come from the role registry
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                "/api/team-invitations/bulk/",
+                {"team": self.team.pk, "invitations": invitees},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            [
+                "created",
+                "error",
+                "error",
+                "error",
+                "error",
+                "error",
+                "created",
+                "error",
+            ],
+        )
+        self.assertIn("phone_number", response.data["results"][3]["errors"])
+        self.assertIn("email", response.data["results"][7]["errors"])
+        self.assertIn("role", response.data["results"][4]["errors"])
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list("to", flat=True)),
+            [["four@example.com"], ["one@example.com"]],
+        )
+
+    def test_bulk_invitations_require_members_add_permission(self):
+        regular = self.create_user("regular@example.com")
+        TeamMember.objects.create(team=self.team, user=regular, role=self.regular_role)
+        self.client.force_authenticate(regular)
+        response = self.client.post(
+            "/api/team-invitations/bulk/",
+            {"team": self.team.pk, "invitations": [{"email": "one@example.com"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(TeamInvitation.objects.exists())
+
+
+class ExpireInvitationsCommandTests(TeamTestMixin, APITestCase):
+    def create_invitation(self, email, expires_in, status="pending"):
+        return TeamInvitation.objects.create(
+            team=self.team,
+            email=email,
+            first_name="Invited",
+            last_name="Member",
+            phone_number="+14155552671",
+            role=self.regular_role,
+            status=status,
+            expires_at=timezone.now() + expires_in,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.team = self.create_team("Alpha")
+
+    def test_expires_pending_invitations_in_batches(self):
+        expired = [
+            self.create_invitation(f"expired{index}@example.com", timedelta(days=-1))
+            for index in range(3)
+        ]
+        live = self.create_invitation("live@example.com", timedelta(days=1))
+        accepted = self.create_invitation(
+            "accepted@example.com", timedelta(days=-1), status="accepted"
+        )
+
+        call_command("expire_invitations", batch_size=2, stdout=StringIO())
+
+        statuses = dict(TeamInvitation.objects.values_list("id", "status"))
+        self.assertEqual(
+            {statuses[invitation.pk] for invitation in expired}, {"expired"}
+        )
+        self.assertEqual(statuses[live.pk], "pending")
+        self.assertEqual(statuses[accepted.pk], "accepted")
+
+    def test_purges_old_expired_and_rejected_invitations(self):
+        old = timezone.now() - timedelta(days=100)
+        for status in ["expired", "rejected", "accepted"]:
+            invitation = self.create_invitation(
+                f"{status}@example.com", timedelta(days=-100), status=status
+            )
+            TeamInvitation.objects.filter(pk=invitation.pk).update(updated_at=old)
+        recent = self.create_invitation(
+            "recent@example.com", timedelta(days=-1), status="rejected"
+        )
+
+        call_command("expire_invitations", retention_days=90, stdout=StringIO())
+
+        self.assertEqual(
+            sorted(TeamInvitation.objects.values_list("email", flat=True)),
+            ["accepted@example.com", recent.email],
+        )
+
+    def test_expired_invitation_cannot_be_accepted(self):
+        user = self.create_user("expired@example.com")
+        invitation = self.create_invitation(
+            user.email, timedelta(days=1), status="expired"
+        )
+        self.client.force_authenticate(user)
+        response = self.client.post(f"/api/team-invitations/{invitation.pk}/accept/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Invitation has expired.")
+
+    def test_invitations_past_their_expiry_date_are_expired_on_use(self):
+        user = self.create_user("late@example.com")
+        accepted = self.create_invitation(user.email, timedelta(days=-1))
+        rejected = self.create_invitation("other@example.com", timedelta(days=-1))
+        self.client.force_authenticate(user)
+
+        response = self.client.post(f"/api/team-invitations/{accepted.pk}/accept/")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(f"/api/team-invitations/{rejected.pk}/reject/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Invitation has expired.")
+
+        statuses = dict(TeamInvitation.objects.values_list("id", "status"))
+        self.assertEqual(statuses, {accepted.pk: "expired", rejected.pk: "expired"})
+        self.assertFalse(TeamMember.objects.filter(user=user).exists())
@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedDefaultRouter
 from .views import (
     TeamViewSet,
     TeamInvitationCreateView,
+    TeamInvitationBulkCreateView,
     TeamRoleViewSet,
     TeamActiveInvitationsView,
     TeamInvitationDetailView,
@@ -13,6 +15,12 @@ from .views import (
     TeamMemberViewSet,
     MyTeamPermissionsView,
 )
+from .async_views import (
+    MyActiveInvitationsAsyncView,
+    MyTeamPermissionsAsyncView,
+    TeamInvitationDetailAsyncView,
+    TeamMemberListAsyncView,
+)
 
 router = DefaultRouter()
 router.register(r"teams", TeamViewSet, basename="team")
@@ -21,9 +29,32 @@ router.register(r"team-roles", TeamRoleViewSet, basename="team-role")
 teams_router = NestedDefaultRouter(router, r"teams", lookup="team")
 teams_router.register(r"members", TeamMemberViewSet, basename="team-members")
 
+if settings.ASYNC_READ_VIEWS:
+    # Async variants of the read heavy endpoints, for ASGI workers
+    team_invitation_detail_view = TeamInvitationDetailAsyncView.as_view()
+    my_active_invitations_view = MyActiveInvitationsAsyncView.as_view()
+    my_team_permissions_view = MyTeamPermissionsAsyncView.as_view()
+    members_list = next(
+        url for url in teams_router.urls if url.name == "team-members-list"
+    )
+    async_urlpatterns = [
+        # Takes over GET on the members collection, ahead of TeamMemberViewSet,
+        # which still serves the other methods
+        path(
+            "teams/<int:team_pk>/members/",
+            TeamMemberListAsyncView.as_view(sync_view=members_list.callback),
+            name="team-members-list",
+        ),
+    ]
+else:
+    team_invitation_detail_view = TeamInvitationDetailView.as_view()
+    my_active_invitations_view = MyActiveInvitationsView.as_view()
+    my_team_permissions_view = MyTeamPermissionsView.as_view()
+    async_urlpatterns = []
 
 urlpatterns = (
-    router.urls
+    async_urlpatterns
+    + router.urls
     + teams_router.urls
     + [  # Specific paths that don't follow ViewSet patterns
         # Team Invitations
@@ -32,6 +63,11 @@ urlpatterns = (
             TeamInvitationCreateView.as_view(),
             name="team-invitation-create",
         ),
+        path(
+            "team-invitations/bulk/",
+            TeamInvitationBulkCreateView.as_view(),
+            name="team-invitation-bulk-create",
+        ),
         path(
             "teams/<int:team_id>/active-invitations/",
             TeamActiveInvitationsView.as_view(),
@@ -39,7 +75,7 @@ urlpatterns = (
         ),
         path(
             "team-invitations/<int:invitation_id>/",
-            TeamInvitationDetailView.as_view(),
+            team_invitation_detail_view,
             name="team-invitation-detail",
         ),
         path(
@@ -54,13 +90,13 @@ urlpatterns = (
         ),
         path(
             "active-invitations/",
-            MyActiveInvitationsView.as_view(),
+            my_active_invitations_view,
             name="my-active-invitations",
         ),
         # Team Permissions
         path(
             "teams/<int:team_id>/permissions/",
-            MyTeamPermissionsView.as_view(),
+            my_team_permissions_view,
             name="my-team-permissions",
         ),
     ]
@@ -1,33 +1,74 @@
+import csv
 from rest_framework import viewsets, generics
 from .models import Team, TeamInvitation, TeamRole, TeamMember
 from .serializers import (
     TeamSerializer,
+    TeamSummarySerializer,
     TeamInvitationSerializer,
+    TeamInvitationBulkCreateSerializer,
     TeamRoleSerializer,
     TeamInvitationDetailSerializer,
     TeamMemberSerializer,
     TeamMemberUpdateSerializer,
 )
-from utils.emailsender import email_sender
+from emails.models import OutboxEmail
 from datetime import timedelta
 from django.utils import timezone
-from django.template.loader import render_to_string
+from .emails import (
+    INVITATION_EXPIRY_DAYS,
+    INVITATION_SUBJECT,
+    render_invitation_email,
+)
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
-from .permissions import HasTeamPermission
+from .permissions import HasTeamPermission, user_has_team_permission
+from .conditional import Validators
+from .pagination import CreatedAtCursorPagination
+from .invitations import invite_many
+from .roles import role_registry
+from .members import member_list_response, team_permissions_response
+from .roster import (
+    FILE_FORMATS,
+    RosterFormatError,
+    batched,
+    aexport_roster,
+    export_roster,
+    read_roster,
+)
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.db.models import Count, Max, Prefetch
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
 class TeamViewSet(viewsets.ModelViewSet):
     serializer_class = TeamSerializer
     permission_classes = [HasTeamPermission]
+    pagination_class = CreatedAtCursorPagination
     required_permission = "team:view"
 
     def get_queryset(self):
         user = self.request.user
-        return Team.objects.filter(teammember__user=user)
+        if self.action == "list":
+            user_teams = TeamMember.objects.filter(user=user).values("team_id")
+            return Team.objects.filter(pk__in=user_teams)
+        # Roles are served by the role registry
+        members = TeamMember.objects.select_related("user")
+        return Team.objects.filter(teammember__user=user).prefetch_related(
+            Prefetch("teammember_set", queryset=members)
+        )
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return TeamSummarySerializer
+        return TeamSerializer
 
     def get_permissions(self):
         if self.action in ["update", "partial_update"]:
@@ -38,9 +79,41 @@ class TeamViewSet(viewsets.ModelViewSet):
             self.required_permission = "team:view"
         return super().get_permissions()
 
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is not None:
+            not_modified = validators.not_modified_response(request)
+            if not_modified is not None:
+                return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return validators.apply(response) if validators is not None else response
+
+    def get_validators(self):
+        """
+        Validators for the team and its roster. None if the team can't be viewed,
+        leaving the error response to the regular retrieve.
+        """
+        try:
+            team_id = int(self.kwargs["pk"])
+        except ValueError:
+            return None
+        if not user_has_team_permission(
+            self.request.user, team_id, self.required_permission
+        ):
+            return None
+        state = Team.objects.filter(pk=team_id).aggregate(
+            team_updated_at=Max("updated_at"),
+            count=Count("teammember"),
+            max_id=Max("teammember__id"),
+            members_updated_at=Max("teammember__updated_at"),
+            users_updated_at=Max("teammember__user__updated_at"),
+            roles_updated_at=Max("teammember__role__updated_at"),
+        )
+        return Validators(team_id, *state.values())
+
     def perform_create(self, serializer):
         team = serializer.save()
-        admin_role = TeamRole.objects.get(name="Admin")
+        admin_role = role_registry.get_by_name("Admin")
         TeamMember.objects.create(team=team, user=self.request.user, role=admin_role)
 
 
@@ -48,6 +121,18 @@ class TeamRoleViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = TeamRole.objects.all()
     serializer_class = TeamRoleSerializer
 
+    def list(self, request, *args, **kwargs):
+        roles = sorted(role_registry.roles().values(), key=lambda role: role.pk)
+        return Response(self.get_serializer(roles, many=True).data)
+
+    def get_object(self):
+        try:
+            role = role_registry.get(int(self.kwargs["pk"]))
+        except (ValueError, TeamRole.DoesNotExist):
+            raise NotFound("No TeamRole matches the given query.")
+        self.check_object_permissions(self.request, role)
+        return role
+
 
 class TeamInvitationCreateView(generics.CreateAPIView):
     queryset = TeamInvitation.objects.all()
@@ -55,42 +140,65 @@ class TeamInvitationCreateView(generics.CreateAPIView):
     permission_classes = [HasTeamPermission]
     required_permission = "members:add"
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        expires_at = timezone.now() + timedelta(days=15)
+        expires_at = timezone.now() + timedelta(days=INVITATION_EXPIRY_DAYS)
         invitation = serializer.save(expires_at=expires_at)
-        current_user = self.request.user
-        context = {
-            "inviter_name": current_user.get_full_name(),
-            "team_name": invitation.team.name,
-            "accept_url": invitation.get_accept_url(),
-            "reject_url": invitation.get_reject_url(),
-            "expiry_days": 15,  # TODO: Make this dynamic
-        }
-        html_body = render_to_string("teams/invitation_email.html", context)
-        plain_body = render_to_string("teams/invitation_email.txt", context)
-        email_sender.send_email(
+        html_body, plain_body = render_invitation_email(invitation, self.request.user)
+        # Delivered by the send_queued_emails worker once the invitation is committed
+        OutboxEmail.objects.enqueue(
             invitation.email,
-            "You have been invited to a team",
+            INVITATION_SUBJECT,
             html_body,
             plain_body=plain_body,
         )
 
 
-class TeamActiveInvitationsView(APIView):
+class TeamInvitationBulkCreateView(APIView):
+    """
+    Invites many people to a team at once. Conflicts with existing members and
+    invitations are checked with one query each, and the results are reported per row.
+    """
+
     permission_classes = [HasTeamPermission]
+    required_permission = "members:add"
+
+    @transaction.atomic
+    def post(self, request):
+        serializer = TeamInvitationBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        team = serializer.validated_data["team"]
+        self.check_object_permissions(request, team)
+
+        results, created = invite_many(
+            team,
+            serializer.validated_data["invitations"],
+            request.user,
+            role_registry.roles(),
+        )
+        for index, result in enumerate(results):
+            result["index"] = index
+        response_status = (
+            status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+        return Response(
+            {"created": created, "results": results}, status=response_status
+        )
+
+
+class TeamActiveInvitationsView(generics.ListAPIView):
+    serializer_class = TeamInvitationSerializer
+    permission_classes = [HasTeamPermission]
+    pagination_class = CreatedAtCursorPagination
     required_permission = "team:view"
 
-    def get(self, request, team_id):
+    def get_queryset(self):
         try:
-            team = Team.objects.get(id=team_id)
+            team = Team.objects.get(id=self.kwargs["team_id"])
         except Team.DoesNotExist:
-            return Response(
-                {"detail": "Team not found."}, status=status.HTTP_404_NOT_FOUND
-            )
-        self.check_object_permissions(request, team)
-        invitations = TeamInvitation.objects.active_invitations_for_team(team)
-        serializer = TeamInvitationSerializer(invitations, many=True)
-        return Response(serializer.data)
+            raise NotFound("Team not found.")
+        self.check_object_permissions(self.request, team)
+        return TeamInvitation.objects.active_invitations_for_team(team)
 
 
 class TeamInvitationDetailView(APIView):
@@ -102,17 +210,17 @@ class TeamInvitationDetailView(APIView):
         return Response(serializer.data)
 
 
-class MyActiveInvitationsView(APIView):
+class MyActiveInvitationsView(generics.ListAPIView):
+    serializer_class = TeamInvitationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
-    def get(self, request):
-        user_email = request.user.email
-        now = timezone.now()
-        invitations = TeamInvitation.objects.filter(
-            email=user_email, status="pending", expires_at__gt=now
+    def get_queryset(self):
+        return TeamInvitation.objects.filter(
+            email=self.request.user.email,
+            status="pending",
+            expires_at__gt=timezone.now(),
         )
-        serializer = TeamInvitationSerializer(invitations, many=True)
-        return Response(serializer.data)
 
 
 class AcceptInvitationView(APIView):
@@ -120,14 +228,14 @@ class AcceptInvitationView(APIView):
 
     def post(self, request, invitation_id):
         invitation = get_object_or_404(TeamInvitation, id=invitation_id)
-        if invitation.status != "pending":
+        if invitation.expire_if_due():
             return Response(
-                {"detail": "Invitation is not pending."},
+                {"detail": "Invitation has expired."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if invitation.expires_at <= timezone.now():
+        if invitation.status != "pending":
             return Response(
-                {"detail": "Invitation has expired."},
+                {"detail": "Invitation is not pending."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if request.user.email.lower() != invitation.email.lower():
@@ -153,14 +261,14 @@ class RejectInvitationView(APIView):
 
     def post(self, request, invitation_id):
         invitation = get_object_or_404(TeamInvitation, id=invitation_id)
-        if invitation.status != "pending":
+        if invitation.expire_if_due():
             return Response(
-                {"detail": "Invitation is not pending."},
+                {"detail": "Invitation has expired."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if invitation.expires_at <= timezone.now():
+        if invitation.status != "pending":
             return Response(
-                {"detail": "Invitation has expired."},
+                {"detail": "Invitation is not pending."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         invitation.status = "rejected"
@@ -171,16 +279,19 @@ class RejectInvitationView(APIView):
 class TeamMemberViewSet(viewsets.ModelViewSet):
     queryset = TeamMember.objects.all()
     permission_classes = [HasTeamPermission]
+    pagination_class = CreatedAtCursorPagination
     required_permission = "members:view"
 
     def get_object_without_permission_check(self):
         """
         Get the object without checking permissions.
-        Similar to DRF's APIView.get_object() but without checking permissions.
+        The member is fetched once per request, and reused by get_object.
         """
-        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
-        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
-        return get_object_or_404(self.queryset, **filter_kwargs)
+        if not hasattr(self, "_member"):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            self._member = get_object_or_404(self.get_queryset(), **filter_kwargs)
+        return self._member
 
     def get_serializer_class(self):
         if self.action in ["update", "partial_update"]:
@@ -190,10 +301,11 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ["update", "partial_update"]:
             self.required_permission = "members:update"
+        elif self.action == "import_roster":
+            self.required_permission = "members:add"
         elif self.action == "destroy":
             current_member = self.get_object_without_permission_check()
-            if self.request.user.id == current_member.user.id:
-                print("current_member", current_member)
+            if self.request.user.id == current_member.user_id:
                 self.required_permission = "members:leave"
             else:
                 self.required_permission = "members:remove"
@@ -203,15 +315,115 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         team_id = self.kwargs.get("team_pk")
-        if team_id:
-            return TeamMember.objects.filter(team_id=team_id)
-        return TeamMember.objects.none()
+        if not team_id:
+            return TeamMember.objects.none()
+        return TeamMember.objects.filter(team_id=team_id).select_related("user", "role")
 
     def get_object(self):
-        obj = super().get_object()
-        self.check_object_permissions(self.request, obj.team)
+        obj = self.get_object_without_permission_check()
+        self.check_object_permissions(self.request, obj)
         return obj
 
+    def get_team_id(self):
+        try:
+            return int(self.kwargs["team_pk"])
+        except ValueError:
+            raise NotFound("Team not found.")
+
+    def check_team_permission(self, team_id):
+        # Collection actions have no object to check HasTeamPermission against
+        if not user_has_team_permission(
+            self.request.user, team_id, self.required_permission
+        ):
+            self.permission_denied(self.request)
+
+    def get_file_format(self):
+        # `format` is reserved by DRF for content negotiation
+        file_format = self.request.query_params.get("file_format", "csv")
+        if file_format not in FILE_FORMATS:
+            raise ValidationError(
+                {"file_format": [f"Must be one of: {', '.join(FILE_FORMATS)}."]}
+            )
+        return file_format
+
+    def list(self, request, *args, **kwargs):
+        return member_list_response(
+            request, self.get_team_id(), self.paginate_members, Response
+        )
+
+    def paginate_members(self, queryset):
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data).data
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export_roster(self, request, *args, **kwargs):
+        """Streams the team's roster as CSV or JSONL (?file_format=csv|jsonl)."""
+        team_id = self.get_team_id()
+        self.check_team_permission(team_id)
+        file_format = self.get_file_format()
+        chunk_size = settings.TEAM_ROSTER_EXPORT_CHUNK_SIZE
+        rows = (
+            aexport_roster(team_id, file_format, chunk_size)
+            if isinstance(request._request, ASGIRequest)
+            else export_roster(team_id, file_format, chunk_size)
+        )
+        response = StreamingHttpResponse(rows, content_type=FILE_FORMATS[file_format])
+        response["Content-Disposition"] = (
+            f'attachment; filename="team-{team_id}-members.{file_format}"'
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_roster(self, request, *args, **kwargs):
+        """
+        Invites everyone listed in an uploaded CSV or JSONL roster (as exported).
+        Rows are invited in batches, each in its own transaction, and the results
+        are reported per row.
+        """
+        team_id = self.get_team_id()
+        self.check_team_permission(team_id)
+        file_format = self.get_file_format()
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+
+        team = get_object_or_404(Team, pk=team_id)
+        roles = role_registry.roles()
+        role_ids_by_name = {role.name: role.pk for role in roles.values()}
+        results = []
+        created = 0
+        try:
+            for rows in batched(
+                read_roster(upload, file_format, role_ids_by_name),
+                settings.TEAM_ROSTER_IMPORT_BATCH_SIZE,
+            ):
+                with transaction.atomic():
+                    batch_results, batch_created = invite_many(
+                        team, rows, request.user, roles
+                    )
+                results += batch_results
+                created += batch_created
+        except (RosterFormatError, csv.Error, UnicodeDecodeError) as e:
+            # Batches read before the error stay imported
+            return Response(
+                {"detail": str(e), "created": created, "results": results},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        for index, result in enumerate(results):
+            result["index"] = index
+        response_status = (
+            status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+        return Response(
+            {"created": created, "results": results}, status=response_status
+        )
+
     def create(self, request, *args, **kwargs):
         return Response(
             {
@@ -222,36 +434,18 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        if TeamMember.objects.is_last_admin(instance):
+        if not TeamMember.objects.remove_member(instance):
             return Response(
-                {"detail": "Cannot remove the last admin from the team. Please assign another admin first."},
-                status=status.HTTP_400_BAD_REQUEST
+                {
+                    "detail": "Cannot remove the last admin from the team. Please assign another admin first."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        return super().destroy(request, *args, **kwargs)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class MyTeamPermissionsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, team_id):
-        try:
-            team = Team.objects.get(id=team_id)
-        except Team.DoesNotExist:
-            return Response(
-                {"detail": "Team not found."}, status=status.HTTP_404_NOT_FOUND
-            )
-        try:
-            team_member = TeamMember.objects.get(team=team, user=request.user)
-        except TeamMember.DoesNotExist:
-            return Response(
-                {"detail": "You are not a member of this team."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-        role = team_member.role
-        return Response(
-            {
-                "team": team.id,
-                "role": role.name,
-                "permissions": role.permissions,
-            }
-        )
+        return team_permissions_response(request, team_id, Response)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from utils.validators.phone_number_validator import warm_up_phone_number_metadata
 
 
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if settings.PHONE_NUMBER_METADATA_WARM_UP:
+            warm_up_phone_number_metadata()
@@ -1,5 +1,28 @@
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from django.conf import settings
+from django.core.cache import caches
+
+USER_CACHE_KEY_PREFIX = "users:auth"
+
+
+def user_cache_key(user_id):
+    return f"{USER_CACHE_KEY_PREFIX}:{user_id}"
+
+
+def get_user_cache():
+    if not settings.AUTH_USER_CACHE or not settings.AUTH_USER_CACHE_TIMEOUT:
+        return None
+    return caches[settings.AUTH_USER_CACHE]
+
+
+def invalidate_cached_user(user_id):
+    cache = get_user_cache()
+    if cache is not None:
+        cache.delete(user_cache_key(user_id))
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -10,3 +33,62 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         validated_token = self.get_validated_token(raw_token)
         return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        """
+        Serves the user from a short lived cache, if AUTH_USER_CACHE is set, avoiding
+        a query on every request. Cached users are invalidated when saved or deleted
+        (see users.signals), but changes made without signals (eg. queryset updates)
+        only apply once the entry expires, after AUTH_USER_CACHE_TIMEOUT seconds.
+        """
+        cache = get_user_cache()
+        if cache is None:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate, for async views."""
+        raw_token = request.COOKIES.get(settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"])
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        cache = get_user_cache()
+        key = user_cache_key(user_id)
+        user = await cache.aget(key) if cache is not None else None
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            if cache is not None:
+                await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
+        return user
@@ -4,6 +4,7 @@ from rest_framework_simplejwt.serializers import (
     TokenVerifySerializer,
 )
 from rest_framework import serializers
+from utils.validators.phone_number_validator import normalize_phone_number
 from .models import CustomUser
 
 
@@ -59,6 +60,9 @@ class UserSignupSerializer(serializers.ModelSerializer):
             "password2",
         )
 
+    def validate_phone_number(self, value):
+        return normalize_phone_number(value)
+
     def validate(self, attrs):
         if attrs["password"] != attrs["password2"]:
             raise serializers.ValidationError({"password": "Passwords must match."})
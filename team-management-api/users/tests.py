@@ -1,3 +1,113 @@
-from django.test import TestCase
+from unittest import mock
+import phonenumbers
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from utils.validators.phone_number_validator import (
+    PhoneNumberValidator,
+    _validation_error,
+    normalize_phone_number,
+)
+from .models import CustomUser
+from .serializers import CustomTokenObtainPairSerializer
 
-# Create your tests here.
+
+@override_settings(AUTH_USER_CACHE="default")
+class CookieJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", first_name="Ada", last_name="Lovelace"
+        )
+        access_token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]] = str(
+            access_token
+        )
+
+    def test_user_lookup_is_cached(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/active-invitations/")
+        self.assertEqual(response.status_code, 200)
+        # Only the invitations query is left once the user is cached
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/active-invitations/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get("/api/active-invitations/")
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get("/api/active-invitations/")
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(AUTH_USER_CACHE="")
+    def test_user_cache_can_be_disabled(self):
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                response = self.client.get("/api/active-invitations/")
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(AUTH_USER_CACHE="default")
+class HttpOnlyCookieTokenVerifyViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", first_name="Ada", last_name="Lovelace"
+        )
+        self.access_cookie = settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"]
+        access_token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.cookies[self.access_cookie] = str(access_token)
+
+    def test_verify_returns_user_without_queries_once_cached(self):
+        self.client.post("/api/token/verify/")
+        with self.assertNumQueries(0):
+            response = self.client.post("/api/token/verify/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "user@example.com")
+        self.assertEqual(response.data["first_name"], "Ada")
+
+    def test_verify_rejects_invalid_tokens(self):
+        refresh_token = CustomTokenObtainPairSerializer.get_token(self.user)
+        for token in ["not-a-token", str(refresh_token)]:
+            self.client.cookies[self.access_cookie] = token
+            response = self.client.post("/api/token/verify/")
+            self.assertEqual(response.status_code, 401)
+
+
+class PhoneNumberValidatorTests(SimpleTestCase):
+    def test_validation_results_are_memoized(self):
+        validator = PhoneNumberValidator()
+        _validation_error.cache_clear()
+        with mock.patch.object(
+            phonenumbers, "parse", wraps=phonenumbers.parse
+        ) as parse:
+            for _ in range(2):
+                validator("+14155552671")
+                with self.assertRaisesMessage(
+                    ValidationError, "+1415 is not a valid phone number."
+                ):
+                    validator("+1415")
+                with self.assertRaises(ValidationError):
+                    validator("not a number")
+        # Each number is parsed once, and served from the cache the second time
+        self.assertEqual(parse.call_count, 3)
+        self.assertEqual(_validation_error.cache_info().hits, 3)
+
+    @override_settings(PHONE_NUMBER_E164=True)
+    def test_numbers_are_normalized_to_e164(self):
+        self.assertEqual(normalize_phone_number("+1 (415) 555-2671"), "+14155552671")
+        self.assertEqual(normalize_phone_number(""), "")
+
+    @override_settings(PHONE_NUMBER_E164=True)
+    def test_e164_numbers_are_not_parsed_again(self):
+        with mock.patch.object(phonenumbers, "parse") as parse:
+            self.assertEqual(normalize_phone_number("+14155552671"), "+14155552671")
+        parse.assert_not_called()
+
+    def test_normalization_is_disabled_by_default(self):
+        self.assertEqual(
+            normalize_phone_number("+1 (415) 555-2671"), "+1 (415) 555-2671"
+        )
@@ -9,12 +9,12 @@ from django.conf import settings
 from .serializers import (
     CustomTokenObtainPairSerializer,
     CustomTokenRefreshSerializer,
-    CustomTokenVerifySerializer,
     UserSerializer,
     UserSignupSerializer,
 )
 from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from .authentication import CookieJWTAuthentication
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 
@@ -73,8 +73,6 @@ class HttpOnlyCookieTokenVerifyView(TokenVerifyView):
     Custom view to verify access token and set it as HttpOnly cookie.
     """
 
-    serializer_class = CustomTokenVerifySerializer
-
     def post(self, request, *args, **kwargs):
         access_token = request.COOKIES.get(settings.SIMPLE_JWT["AUTH_COOKIE_ACCESS"])
         if not access_token:
@@ -83,20 +81,17 @@ class HttpOnlyCookieTokenVerifyView(TokenVerifyView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        serializer = self.get_serializer(data={"token": access_token})
-
+        # Decode and validate the token once. The user is served from the auth user
+        # cache if AUTH_USER_CACHE is set, and queried otherwise
         try:
-            serializer.is_valid(raise_exception=True)
-        except Exception as e:
+            token = AccessToken(access_token)
+        except TokenError as e:
             return Response(
                 {"detail": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED
             )
 
         try:
-            token = AccessToken(access_token)
-            user_id = token["user_id"]
-            User = get_user_model()
-            user = User.objects.get(id=user_id)
+            user = CookieJWTAuthentication().get_user(token)
             user_data = UserSerializer(user).data
         except Exception as e:
             return Response(
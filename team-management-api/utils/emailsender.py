@@ -1,38 +1,128 @@
+from contextlib import contextmanager
 from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.signals import setting_changed
 from django.conf import settings
+from django.dispatch import receiver
+import queue
 import re
+import smtplib
+import threading
 import logging
 
+# Used to derive a plain text body from the HTML one, when none is given
+HTML_TAG_PATTERN = re.compile(r"<[^<]+?>")
+
 
 class EmailSender:
+    """
+    Sends emails through a bounded pool of open SMTP connections, shared across
+    threads, so consecutive sends skip the TCP + STARTTLS + AUTH handshake.
+    """
+
+    def __init__(self, pool_size: int = None):
+        self.pool_size = pool_size or settings.EMAIL_CONNECTION_POOL_SIZE
+        self._idle_connections = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+    def get_connection(self):
+        return get_connection(
+            host=settings.RESEND_SMTP_HOST,
+            port=settings.RESEND_SMTP_PORT,
+            username=settings.RESEND_SMTP_USERNAME,
+            password=settings.RESEND_SMTP_API_KEY,
+            use_tls=True,
+        )
+
+    def _is_alive(self, connection):
+        smtp = getattr(connection, "connection", None)
+        if smtp is None:
+            # Non SMTP backends (console, locmem) don't keep a socket open
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows an open connection from the pool, reconnecting if the server dropped
+        it while idle. Connections that raise while borrowed are discarded.
+        """
+        with self._slots:
+            try:
+                connection = self._idle_connections.get_nowait()
+                if not self._is_alive(connection):
+                    connection.close()
+                    connection.open()
+            except queue.Empty:
+                connection = self.get_connection()
+                connection.open()
+            try:
+                yield connection
+            except Exception:
+                connection.close()
+                raise
+            self._idle_connections.put(connection)
+
+    def close(self):
+        """Closes all idle pooled connections."""
+        while True:
+            try:
+                connection = self._idle_connections.get_nowait()
+            except queue.Empty:
+                return
+            connection.close()
+
+    def build_email(
+        self,
+        to: str | list[str],
+        subject: str,
+        body: str,
+        plain_body: str = None,
+        connection=None,
+    ) -> EmailMultiAlternatives:
+        recipients = to if isinstance(to, list) else [to]
+        if not plain_body:
+            plain_body = HTML_TAG_PATTERN.sub("", body)
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=plain_body,
+            from_email=settings.FROM_EMAIL,
+            to=recipients,
+            connection=connection,
+        )
+        email.attach_alternative(body, "text/html")
+        return email
+
     def send_email(
         self, to: str | list[str], subject: str, body: str, plain_body: str = None
     ):
-        # TODO: Queue email sending for background processing
+        """
+        Sends the email synchronously. Request handlers should queue emails with
+        `OutboxEmail.objects.enqueue` instead.
+        """
         try:
-            with get_connection(
-                host=settings.RESEND_SMTP_HOST,
-                port=settings.RESEND_SMTP_PORT,
-                username=settings.RESEND_SMTP_USERNAME,
-                password=settings.RESEND_SMTP_API_KEY,
-                use_tls=True,
-            ) as connection:
-                recipients = to if isinstance(to, list) else [to]
-                if not plain_body:
-                    plain_body = re.sub("<[^<]+?>", "", body)
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=plain_body,
-                    from_email=settings.FROM_EMAIL,
-                    to=recipients,
-                    connection=connection,
-                )
-                email.attach_alternative(body, "text/html")
-                email.send()
+            with self.connection() as connection:
+                self.build_email(to, subject, body, plain_body, connection).send()
         except Exception as e:
             logging.exception("Failed to send email")
             return False
         return True
 
+    def send_many(self, messages: list[EmailMultiAlternatives]) -> int:
+        """Sends all messages through a single pooled connection, returns the number sent."""
+        if not messages:
+            return 0
+        with self.connection() as connection:
+            return connection.send_messages(messages)
+
 
 email_sender = EmailSender()
+
+
+@receiver(setting_changed)
+def close_pooled_connections(setting, **kwargs):
+    # Pooled connections were opened with the previous email settings
+    if setting.startswith(("EMAIL_", "RESEND_SMTP_")):
+        email_sender.close()
@@ -1,29 +1,63 @@
+import functools
+import re
 import phonenumbers
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+# Results are memoized per raw input, parsing with libphonenumber being costly
+VALIDATION_CACHE_SIZE = 4096
+
+# Numbers already in E.164 format, the normalized form, which needs no formatting
+E164_PATTERN = re.compile(r"^\+[1-9]\d{1,14}$")
+
+
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _validation_error(value: str):
+    """Returns the (message, params) of the validation error, or None if valid."""
+    try:
+        phone_number = phonenumbers.parse(value)
+    except phonenumbers.NumberParseException as e:
+        return (
+            _("%(value)s is not a valid phone number: %(error)s"),
+            {"value": value, "error": str(e)},
+        )
+    if not phonenumbers.is_valid_number(phone_number):
+        return _("%(value)s is not a valid phone number."), {"value": value}
+    if not phonenumbers.is_possible_number(phone_number):
+        return _("%(value)s is not a possible phone number."), {"value": value}
+    return None
+
+
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _format_e164(value: str):
+    try:
+        phone_number = phonenumbers.parse(value)
+    except phonenumbers.NumberParseException:
+        return value
+    return phonenumbers.format_number(phone_number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_phone_number(value: str):
+    """
+    Returns the number in E.164 format (eg. +14155552671) if PHONE_NUMBER_E164 is
+    enabled, so the same number is always stored, and validated, as one string.
+    """
+    if not value or not settings.PHONE_NUMBER_E164 or E164_PATTERN.fullmatch(value):
+        return value
+    return _format_e164(value)
+
+
+def warm_up_phone_number_metadata():
+    """Loads all the libphonenumber metadata, instead of lazily on first use."""
+    phonenumbers.PhoneMetadata.load_all()
+
 
 class PhoneNumberValidator:
     def __call__(self, value: str):
         if not value:
             return
-        try:
-            phone_number = phonenumbers.parse(value)
-
-            if not phonenumbers.is_valid_number(phone_number):
-                raise ValidationError(
-                    _("%(value)s is not a valid phone number."),
-                    params={"value": value},
-                )
-
-            if not phonenumbers.is_possible_number(phone_number):
-                raise ValidationError(
-                    _("%(value)s is not a possible phone number."),
-                    params={"value": value},
-                )
-
-        except phonenumbers.NumberParseException as e:
-            raise ValidationError(
-                _("%(value)s is not a valid phone number: %(error)s"),
-                params={"value": value, "error": str(e)},
-            )
+        error = _validation_error(value)
+        if error is not None:
+            message, params = error
+            raise ValidationError(message, params=params)
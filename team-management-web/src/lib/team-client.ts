@@ -28,6 +28,13 @@ const teamSchema = z.object({
 	members: z.array(teamMemberSchema),
 });
 
+const teamSummarySchema = z.object({
+	id: z.number(),
+	name: z.string(),
+	description: z.string(),
+	member_count: z.number(),
+});
+
 const teamMemberInvitationSchema = z.object({
 	team: z.number(),
 	email: z.string(),
@@ -60,6 +67,33 @@ const teamInvitationDetailSchema = teamInvitationSchema.extend({
     user_exists: z.boolean(),
 });
 
+const paginatedSchema = <T extends z.ZodTypeAny>(itemSchema: T) =>
+	z.object({
+		next: z.string().nullable(),
+		previous: z.string().nullable(),
+		results: z.array(itemSchema),
+	});
+
+// Follows the `next` links of a paginated endpoint, returning the results of all pages
+const fetchAllPages = async <T extends z.ZodTypeAny>(
+	url: string,
+	itemSchema: T,
+	errorMessage: string,
+): Promise<z.infer<T>[]> => {
+	const results: z.infer<T>[] = [];
+	let nextUrl: string | null = url;
+	while (nextUrl) {
+		const response = await apiClient(nextUrl);
+		if (!response.ok) {
+			throw new Error(errorMessage);
+		}
+		const page = paginatedSchema(itemSchema).parse(await response.json());
+		results.push(...page.results);
+		nextUrl = page.next;
+	}
+	return results;
+};
+
 const teamPermissionSchema = z.object({
     team: z.number(),
     role: z.string(),
@@ -67,6 +101,7 @@ const teamPermissionSchema = z.object({
 });
 
 export type Team = z.infer<typeof teamSchema>;
+export type TeamSummary = z.infer<typeof teamSummarySchema>;
 export type TeamMember = z.infer<typeof teamMemberSchema>;
 export type TeamMemberInvitation = z.infer<typeof teamMemberInvitationSchema>;
 export type TeamInvitation = z.infer<typeof teamInvitationSchema>;
@@ -94,12 +129,11 @@ export const teamClient = {
     },
 	getTeams: async () => {
 		try {
-			const response = await apiClient(`${env.VITE_API_URL}/api/teams/`);
-			if (!response.ok) {
-				throw new Error("Failed to fetch teams");
-			}
-			const data = await response.json();
-			return teamSchema.array().parse(data);
+			return await fetchAllPages(
+				`${env.VITE_API_URL}/api/teams/`,
+				teamSummarySchema,
+				"Failed to fetch teams",
+			);
 		} catch (error) {
 			console.error("Error fetching teams:", error);
 			throw error;
@@ -170,12 +204,11 @@ export const teamClient = {
     },
 	getActiveInvitations: async (teamId: number) => {
 		try {
-			const response = await apiClient(`${env.VITE_API_URL}/api/teams/${teamId}/active-invitations/`);
-			if (!response.ok) {
-				throw new Error("Failed to fetch active invitations");
-			}
-			const data = await response.json();
-			return teamInvitationSchema.array().parse(data);
+			return await fetchAllPages(
+				`${env.VITE_API_URL}/api/teams/${teamId}/active-invitations/`,
+				teamInvitationSchema,
+				"Failed to fetch active invitations",
+			);
 		} catch (error) {
 			console.error("Error fetching active invitations:", error);
 			throw error;